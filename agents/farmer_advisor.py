@@ -2,16 +2,44 @@
 
 from agents.base_agent import BaseAgent
 import logging
+import numpy as np
 import pandas as pd
 import re
+from utils.db_utils import get_crop_summary
+from utils.datasets import registry
+from core.neighbour_index import NeighbourIndex
 
 class FarmerAdvisor(BaseAgent):
-    def __init__(self, name):
+    # Half-widths of the "similar conditions" window used for recommendations
+    SIMILARITY_WINDOW = {"Soil_pH": 0.5, "Rainfall_mm": 100, "Temperature_C": 2}
+
+    def __init__(self, name, knn_fallback=None):
         super().__init__(name)
         logging.info(f"Initializing {name} agent")
-        self.farm_data = pd.read_csv("data/farmer_advisor_dataset.csv")
+        # When set, sparse regions with no farms in the window fall back to
+        # this many nearest farms instead of returning no recommendation
+        self.knn_fallback = knn_fallback
+        self.farm_data = registry.get("farms")
+        self._build_indexes()
+        registry.on_reload(self._on_dataset_reload)
         logging.info(f"Loaded {len(self.farm_data)} farm records")
 
+    def _on_dataset_reload(self, name):
+        if name == "farms":
+            self.farm_data = registry.get("farms")
+            self._build_indexes()
+
+    def _build_indexes(self):
+        # Farm_ID -> row position, so lookups no longer scan the table
+        self.farm_positions = {
+            farm_id: position for position, farm_id in enumerate(self.farm_data['Farm_ID'].tolist())
+        }
+        self.neighbour_index = NeighbourIndex(
+            self.farm_data,
+            list(self.SIMILARITY_WINDOW),
+            list(self.SIMILARITY_WINDOW.values()),
+        )
+
     def run(self, message):
         if isinstance(message, dict):
             query = message.get("query", "")
@@ -36,9 +64,17 @@ class FarmerAdvisor(BaseAgent):
             }
 
     def analyze_farm_data(self):
-        crop_yield = self.farm_data.groupby('Crop_Type')['Crop_Yield_ton'].mean().sort_values(ascending=False)
+        # Served from the crop_summary table maintained by database/init_db.py
+        summary = get_crop_summary()
+        if not summary.empty:
+            crop_yield = summary.set_index('Crop_Type')['Avg_Yield'].sort_values(ascending=False)
+            avg_sustainability = (
+                (summary['Avg_Sustainability'] * summary['Row_Count']).sum() / summary['Row_Count'].sum()
+            )
+        else:
+            crop_yield = self.farm_data.groupby('Crop_Type', observed=True)['Crop_Yield_ton'].mean().sort_values(ascending=False)
+            avg_sustainability = self.farm_data['Sustainability_Score'].mean()
         top_crops = crop_yield.head(3).index.tolist()
-        avg_sustainability = self.farm_data['Sustainability_Score'].mean()
 
         response = f"[{self.name}] Farm Analysis: Top performing crops are {', '.join(top_crops)}. "
         response += f"Average sustainability score across farms: {avg_sustainability:.2f}/10."
@@ -51,61 +87,96 @@ class FarmerAdvisor(BaseAgent):
         }
 
     def generate_recommendation(self, message_text, farm_id):
-        if farm_id is not None and farm_id in self.farm_data['Farm_ID'].values:
-            farm_info = self.farm_data[self.farm_data['Farm_ID'] == farm_id].iloc[0]
-            soil_ph = farm_info['Soil_pH']
-            rainfall = farm_info['Rainfall_mm']
-            temperature = farm_info['Temperature_C']
-        else:
-            return {
-                "agent": self.name,
-                "type": "error",
-                "response": f"Farm_ID {farm_id} not found in dataset. Please check and try again."
-            }
+        return self.recommend_many([farm_id])[0]
 
-        # Determine soil type
-        if soil_ph < 6.0:
-            soil_type = "acidic"
-        elif soil_ph > 7.5:
-            soil_type = "alkaline"
-        elif soil_ph > 7.0:
-            soil_type = "slightly alkaline"
-        elif soil_ph < 6.5:
-            soil_type = "slightly acidic"
-        else:
-            soil_type = "neutral"
-
-        # Recommend based on average yield for similar conditions
-        filtered = self.farm_data[
-            (self.farm_data["Soil_pH"].between(soil_ph - 0.5, soil_ph + 0.5)) &
-            (self.farm_data["Rainfall_mm"].between(rainfall - 100, rainfall + 100)) &
-            (self.farm_data["Temperature_C"].between(temperature - 2, temperature + 2))
-        ]
-
-        if not filtered.empty:
-            recommendations = (
-                filtered.groupby("Crop_Type")["Crop_Yield_ton"]
-                .agg(['mean', 'count'])
-                .sort_values(by="mean", ascending=False)
-                .head(3)
-                .reset_index()
-                .rename(columns={'mean': 'Avg_Yield', 'count': 'Sample_Count'})
-            )
-            top_crops = recommendations["Crop_Type"].tolist()
-            detailed = recommendations.to_dict(orient="records")
+    @staticmethod
+    def _classify_soil(soil_ph):
+        """Vectorized soil type labels for an array of pH values"""
+        soil_ph = np.asarray(soil_ph, dtype=np.float64)
+        return np.select(
+            [soil_ph < 6.0, soil_ph > 7.5, soil_ph > 7.0, soil_ph < 6.5],
+            ["acidic", "alkaline", "slightly alkaline", "slightly acidic"],
+            default="neutral",
+        )
 
-            response = f"[{self.name}] Based on soil pH {soil_ph} ({soil_type} soil), I recommend: {', '.join(top_crops)}."
-        else:
-            response = f"[{self.name}] Not enough data to generate a recommendation for Farm_ID {farm_id}."
-            top_crops = []
-            detailed = []
+    def recommend_many(self, farm_ids):
+        """Recommendations for a batch of Farm_IDs, one dict per ID in input order"""
+        farm_ids = list(farm_ids)
+        positions = np.fromiter(
+            (self.farm_positions.get(farm_id, -1) if farm_id is not None else -1 for farm_id in farm_ids),
+            dtype=np.int64,
+            count=len(farm_ids),
+        )
+        found = np.flatnonzero(positions >= 0)
 
-        return {
-            "agent": self.name,
-            "type": "recommendation",
-            "soil_ph": soil_ph,
-            "soil_type": soil_type,
-            "recommended_crops": top_crops,
-            "detailed": detailed,
-            "response": response
-        }
+        # Conditions of every requested farm, in neighbour-index column order
+        centers = self.neighbour_index.values[positions[found]]
+        soil_types = self._classify_soil(centers[:, 0])
+
+        matches = []
+        for center in centers:
+            similar = self.neighbour_index.box_query(center)
+            if len(similar) == 0 and self.knn_fallback:
+                similar = self.neighbour_index.nearest(center, self.knn_fallback)
+            matches.append(similar)
+
+        # One groupby over (requesting farm, crop) for the whole batch
+        rows = np.concatenate(matches) if matches else np.empty(0, dtype=np.int64)
+        owners = np.repeat(np.arange(len(matches)), [len(m) for m in matches])
+        candidates = pd.DataFrame({
+            "Owner": owners,
+            "Crop_Type": self.farm_data["Crop_Type"].to_numpy()[rows],
+            "Crop_Yield_ton": self.farm_data["Crop_Yield_ton"].to_numpy()[rows],
+        })
+        stats = (
+            candidates.groupby(["Owner", "Crop_Type"], observed=True)["Crop_Yield_ton"]
+            .agg(['mean', 'count'])
+            .reset_index()
+            .rename(columns={'mean': 'Avg_Yield', 'count': 'Sample_Count'})
+            .sort_values(by=["Owner", "Avg_Yield"], ascending=[True, False], kind="stable")
+        )
+        top = stats.groupby("Owner", sort=False).head(3)
+        top_owners = top["Owner"].to_numpy()
+        top_crops_all = [str(crop) for crop in top["Crop_Type"]]
+        top_yields = top["Avg_Yield"].tolist()
+        top_counts = top["Sample_Count"].tolist()
+        bounds = np.searchsorted(top_owners, np.arange(len(matches) + 1))
+
+        soil_phs = self.farm_data["Soil_pH"].to_numpy()
+        results = [None] * len(farm_ids)
+        for i, farm_id in enumerate(farm_ids):
+            if positions[i] < 0:
+                results[i] = {
+                    "agent": self.name,
+                    "type": "error",
+                    "response": f"Farm_ID {farm_id} not found in dataset. Please check and try again."
+                }
+
+        for owner, i in enumerate(found):
+            farm_id = farm_ids[i]
+            soil_ph = soil_phs[positions[i]]
+            soil_type = str(soil_types[owner])
+            lo, hi = bounds[owner], bounds[owner + 1]
+
+            if hi > lo:
+                top_crops = top_crops_all[lo:hi]
+                detailed = [
+                    {"Crop_Type": crop, "Avg_Yield": avg, "Sample_Count": count}
+                    for crop, avg, count in zip(top_crops, top_yields[lo:hi], top_counts[lo:hi])
+                ]
+                response = f"[{self.name}] Based on soil pH {soil_ph} ({soil_type} soil), I recommend: {', '.join(top_crops)}."
+            else:
+                response = f"[{self.name}] Not enough data to generate a recommendation for Farm_ID {farm_id}."
+                top_crops = []
+                detailed = []
+
+            results[i] = {
+                "agent": self.name,
+                "type": "recommendation",
+                "soil_ph": soil_ph,
+                "soil_type": soil_type,
+                "recommended_crops": top_crops,
+                "detailed": detailed,
+                "response": response
+            }
+        return results
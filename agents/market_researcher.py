@@ -2,15 +2,21 @@ from agents.base_agent import BaseAgent
 import logging
 import pandas as pd
 import numpy as np
-from utils.db_utils import get_market_data, get_market_trends, query_to_dataframe
+from utils.datasets import registry
+from utils.db_utils import get_market_trends, get_market_opportunities, get_market_summary
 
 class MarketResearcher(BaseAgent):
     def __init__(self, name):
         super().__init__(name)
         logging.info(f"Initializing {name} agent")
-        self.market_data = get_market_data()
+        self.market_data = registry.get("markets")
+        registry.on_reload(self._on_dataset_reload)
         logging.info(f"Loaded {len(self.market_data)} market records")
 
+    def _on_dataset_reload(self, name):
+        if name == "markets":
+            self.market_data = registry.get("markets")
+
     def run(self, message):
         if isinstance(message, dict):
             query = message.get("query", "")
@@ -47,16 +53,7 @@ class MarketResearcher(BaseAgent):
         trends = get_market_trends()
         top_products = trends.head(3)['Product'].tolist()
 
-        opportunity_query = """
-        SELECT Product, AVG(Demand_Index) as Avg_Demand, AVG(Supply_Index) as Avg_Supply,
-               (AVG(Demand_Index) - AVG(Supply_Index)) as Opportunity_Score
-        FROM markets
-        GROUP BY Product
-        HAVING Avg_Demand > Avg_Supply
-        ORDER BY Opportunity_Score DESC
-        LIMIT 3
-        """
-        opportunities = query_to_dataframe(opportunity_query)
+        opportunities = get_market_opportunities(limit=3)
         opportunity_products = opportunities['Product'].tolist() if not opportunities.empty else []
 
         response = f"[{self.name}] Market Trend Analysis: Top products by price×demand: {', '.join(top_products)}. "
@@ -72,9 +69,13 @@ class MarketResearcher(BaseAgent):
         }
 
     def recommend_profitable_crops(self):
-        df = self.market_data.copy()
-        df['Profitability'] = (df['Market_Price_per_ton'] * df['Demand_Index']) / np.maximum(df['Supply_Index'], 0.1)
-        profitability = df.groupby('Product')['Profitability'].mean().sort_values(ascending=False)
+        summary = get_market_summary()
+        if not summary.empty:
+            profitability = summary.set_index('Product')['Avg_Profitability'].sort_values(ascending=False)
+        else:
+            df = self.market_data.copy()
+            df['Profitability'] = (df['Market_Price_per_ton'] * df['Demand_Index']) / np.maximum(df['Supply_Index'], 0.1)
+            profitability = df.groupby('Product', observed=True)['Profitability'].mean().sort_values(ascending=False)
         top_profitable = profitability.head(3).index.tolist()
 
         response = f"[{self.name}] Most profitable crops based on current market: {', '.join(top_profitable)}."
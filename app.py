@@ -6,13 +6,22 @@ import plotly.express as px
 import plotly.graph_objects as go
 from core.crop_rotation import CropRotationPlanner
 from core.weather_integration import WeatherIntegration
+from core.weather_sources import StoreWeatherSource
 from core.yield_prediction import YieldPredictor
 from agents.farmer_advisor import FarmerAdvisor
 from agents.market_researcher import MarketResearcher
 from core.coordinator import Coordinator
 from core.decision_engine import DecisionEngine
+from core.dashboard_stats import DashboardStats
+from utils.datasets import registry
+from utils.weather_store import WeatherStore
+from utils.request_executor import StageExecutor
+from utils.response_cache import ResponseCache
+from utils.chart_cache import ChartCache
+from utils.downsampling import METHODS, PERIODS, aggregate_series, downsample
 import datetime
 import logging
+import os
 
 # Configure logging
 logging.basicConfig(
@@ -25,11 +34,41 @@ logging.basicConfig(
 app = Flask(__name__)
 
 # Initialize components
-farm_data = pd.read_csv("data/farmer_advisor_dataset.csv")
-market_data = pd.read_csv("data/market_researcher_dataset.csv")
+farm_data = registry.get("farms")
+market_data = registry.get("markets")
 crop_rotation = CropRotationPlanner()
-weather = WeatherIntegration()
-yield_predictor = YieldPredictor(load_pretrained=False)  # Don't load pretrained in init to speed startup
+# Daily station records ingested into data/weather replace the simulated
+# history for the stations they cover
+WEATHER_STORE_DIR = os.path.join('data', 'weather')
+weather = WeatherIntegration(
+    source=StoreWeatherSource(WeatherStore(WEATHER_STORE_DIR)) if os.path.isdir(WEATHER_STORE_DIR) else None
+)
+# Models load lazily on first use; crops without a saved model train in
+# worker processes and serve average yields until they are ready
+yield_predictor = YieldPredictor(background_training=True, fast_inference=True)
+
+# Per-crop stages of /recommendation run concurrently on a shared pool; a
+# stage that fails or exceeds its timeout (seconds) falls back to no result
+stage_executor = StageExecutor(max_workers=16)
+STAGE_TIMEOUTS = {"yield": 5.0, "rotation": 2.0, "price": 5.0, "management": 5.0}
+
+# Computed /recommendation results keyed on normalized farm inputs. They
+# expire with the forecast month and are dropped when data or models change;
+# set RESPONSE_CACHE_DB to share them between worker processes via SQLite.
+recommendation_cache = ResponseCache(max_entries=512, db_path=os.environ.get('RESPONSE_CACHE_DB'))
+yield_predictor.model_registry.on_change(recommendation_cache.invalidate)
+
+# Serialized chart payloads keyed by chart, selection and data version,
+# served with ETags and pre-compressed gzip bodies
+chart_cache = ChartCache(max_entries=128)
+
+# Points per crop in the price trend chart; ?points=, ?method= (lttb or
+# minmax) and ?aggregate= (daily or weekly) override the defaults
+PRICE_CHART_POINTS = 500
+PRICE_CHART_MAX_POINTS = 5000
+
+# Index page figures, recomputed only when a dataset changes
+dashboard_stats = DashboardStats()
 
 # Initialize agents
 advisor = FarmerAdvisor(name="FarmerAdvisor")
@@ -43,44 +82,38 @@ crops = sorted(farm_data['Crop_Type'].unique())
 soil_types = sorted(farm_data['Soil_Type'].unique()) if 'Soil_Type' in farm_data.columns else ["Clay", "Loam", "Sandy", "Silt"]
 irrigation_types = sorted(['Drip', 'Sprinkler', 'Flood', 'Furrow'])
 
+def _refresh_datasets(name):
+    """Pick up hot-reloaded datasets from the shared registry"""
+    global farm_data, market_data, crops
+    if name == "farms":
+        farm_data = registry.get("farms")
+        crops = sorted(farm_data['Crop_Type'].unique())
+    elif name == "markets":
+        market_data = registry.get("markets")
+    recommendation_cache.invalidate()
+
+registry.on_reload(_refresh_datasets)
+
 @app.route('/')
 def index():
     """Render the main dashboard"""
-    # Get basic stats for dashboard
-    total_farms = len(farm_data['Farm_ID'].unique())
-    avg_yield = farm_data['Crop_Yield_ton'].mean()
-    avg_sustainability = farm_data['Sustainability_Score'].mean()
-    
-    # Get top crops by yield
-    top_crops = (
-        farm_data.groupby('Crop_Type')['Crop_Yield_ton']
-        .mean()
-        .sort_values(ascending=False)
-        .head(5)
-    ).to_dict()
-    
-    # Get recent market prices - modified to use correct column names
-    # Using 'Product' instead of 'Crop_Type' and 'Market_Price_per_ton' instead of 'Price_per_ton'
-    recent_prices = (
-        market_data
-        .sort_values('Market_ID')  # Sort by Market_ID instead of Date
-        .drop_duplicates(subset=['Product'])
-        .head(5)[['Product', 'Market_Price_per_ton']]
-        .set_index('Product')['Market_Price_per_ton']
-        .to_dict()
-    )
-    
+    stats = dashboard_stats.get()
     return render_template(
         'index.html',
-        total_farms=total_farms,
-        avg_yield=round(avg_yield, 2),
-        avg_sustainability=round(avg_sustainability, 2),
-        top_crops=top_crops,
-        recent_prices=recent_prices,
+        total_farms=stats['total_farms'],
+        avg_yield=stats['avg_yield'],
+        avg_sustainability=stats['avg_sustainability'],
+        top_crops=stats['top_crops'],
+        recent_prices=stats['recent_prices'],
         locations=locations,
         crops=crops
     )
 
+@app.route('/api/dashboard')
+def dashboard_api():
+    """Dashboard statistics as JSON for polling clients"""
+    return jsonify(dashboard_stats.get())
+
 @app.route('/farm-input', methods=['GET', 'POST'])
 def farm_input():
     """Handle farm data input form"""
@@ -112,23 +145,56 @@ def farm_input():
         irrigation_types=irrigation_types
     )
 
+def _rotation_text(crop_type):
+    rotation_plan = crop_rotation.suggest_rotation(crop_type)
+    return crop_rotation.format_rotation_plan(crop_type, rotation_plan)
+
 @app.route('/recommendation')
 def recommendation():
     """Generate and display recommendations"""
     # Extract farm data from query parameters
+    # Numbers are rounded to the precision of the input form so equivalent
+    # queries share a cache entry
     farm_data = {
         'Farm_ID': request.args.get('Farm_ID', ''),
-        'Location': request.args.get('Location', ''),
-        'Field_Size_hectare': float(request.args.get('Field_Size_hectare', 0)),
-        'Soil_pH': float(request.args.get('Soil_pH', 0)),
+        'Location': request.args.get('Location', '').strip(),
+        'Field_Size_hectare': round(float(request.args.get('Field_Size_hectare', 0)), 1),
+        'Soil_pH': round(float(request.args.get('Soil_pH', 0)), 1),
         'Soil_Type': request.args.get('Soil_Type', ''),
-        'Rainfall_mm': float(request.args.get('Rainfall_mm', 0)),
-        'Temperature_C': float(request.args.get('Temperature_C', 0)),
+        'Rainfall_mm': round(float(request.args.get('Rainfall_mm', 0)), 0),
+        'Temperature_C': round(float(request.args.get('Temperature_C', 0)), 1),
         'Irrigation_Type': request.args.get('Irrigation_Type', ''),
-        'Pesticide_Use_kg': float(request.args.get('Pesticide_Use_kg', 0)),
-        'Fertilizer_Use_kg': float(request.args.get('Fertilizer_Use_kg', 0))
+        'Pesticide_Use_kg': round(float(request.args.get('Pesticide_Use_kg', 0)), 1),
+        'Fertilizer_Use_kg': round(float(request.args.get('Fertilizer_Use_kg', 0)), 0)
     }
-    
+
+    # Farm_ID is only echoed back; it doesn't affect the recommendation
+    cache_inputs = {key: value for key, value in farm_data.items() if key != 'Farm_ID'}
+    cache_inputs['Soil_Type'] = cache_inputs['Soil_Type'].strip().lower()
+    cache_inputs['Irrigation_Type'] = cache_inputs['Irrigation_Type'].strip().lower()
+    cache_key = ResponseCache.make_key(cache_inputs)
+    cache_scope = str(weather._current_month().date())
+
+    cached = recommendation_cache.get(cache_key, cache_scope)
+    if cached is None:
+        crop_details, weather_forecast, complete = _compute_recommendation(farm_data)
+        # Degraded pages (fallback stages, warming models) are not cached
+        if complete:
+            recommendation_cache.set(cache_key, cache_scope, (crop_details, weather_forecast))
+    else:
+        crop_details, weather_forecast = cached
+
+    # Render recommendation template
+    return render_template(
+        'recommendation.html',
+        farm_data=farm_data,
+        crop_details=crop_details,
+        weather_forecast=weather_forecast
+    )
+
+def _compute_recommendation(farm_data):
+    """Crop details and forecast records for a /recommendation page, and
+    whether every stage produced a full result"""
     # Get recommendations from agents
     query = f"Recommend crops for soil pH {farm_data['Soil_pH']}"
     agent_recommendations = engine.run({"query": query})
@@ -139,68 +205,130 @@ def recommendation():
     # For the top 3 recommended crops, get:
     recommended_crops = agent_recommendations.get('recommendation', [])
     crop_details = []
+
+    # Weather impact on yield for all recommended crops from one forecast
+    weather_impacts = weather.calculate_yield_impact_many(
+        [crop_rec.get('Crop_Type', '') for crop_rec in recommended_crops[:3]],
+        farm_data['Location'],
+        datetime.datetime.now()
+    )
     
-    for crop_rec in recommended_crops[:3]:
+    # Remaining stages are independent per crop, so run them concurrently
+    stages = stage_executor.group()
+    for i, crop_rec in enumerate(recommended_crops[:3]):
         crop_type = crop_rec.get('Crop_Type', '')
         
         # 1. Weather impact on yield
-        weather_impact = weather.calculate_yield_impact(
-            crop_type, 
-            farm_data['Location'],
-            datetime.datetime.now()
-        )
+        weather_impact = weather_impacts[crop_type]
         
         # 2. Yield prediction
-        yield_prediction = yield_predictor.predict_yield(
-            crop_type,
-            farm_data,
-            weather_impact.get('impact_factor', 1.0)
+        stages.add(
+            (i, 'yield'), yield_predictor.predict_yield, crop_type, farm_data,
+            weather_impact.get('impact_factor', 1.0),
+            fallback={
+                "yield_prediction": None,
+                "explanation": "Yield prediction is temporarily unavailable.",
+                "confidence": 0
+            },
+            timeout=STAGE_TIMEOUTS['yield']
         )
         
         # 3. Crop rotation suggestion
-        rotation_plan = crop_rotation.suggest_rotation(crop_type)
-        rotation_text = crop_rotation.format_rotation_plan(crop_type, rotation_plan)
+        stages.add(
+            (i, 'rotation'), _rotation_text, crop_type,
+            fallback="Rotation plan is temporarily unavailable.",
+            timeout=STAGE_TIMEOUTS['rotation']
+        )
         
         # 4. Market price forecast
         message = {"query": f"Forecast prices for {crop_type}"}
-        price_forecast = researcher.run(message)
+        stages.add((i, 'price'), researcher.run, message, timeout=STAGE_TIMEOUTS['price'])
         
         # 5. Management practices
-        management = yield_predictor.evaluate_management_practices(crop_type, farm_data)
+        stages.add(
+            (i, 'management'), yield_predictor.evaluate_management_practices, crop_type, farm_data,
+            timeout=STAGE_TIMEOUTS['management']
+        )
+
+    results = stages.results()
+    complete = not stages.fell_back
+    for i, crop_rec in enumerate(recommended_crops[:3]):
+        crop_type = crop_rec.get('Crop_Type', '')
         
         # Collect results
         crop_details.append({
             'crop_type': crop_type,
             'sustainability_score': crop_rec.get('Sustainability_Score', 0),
-            'weather_impact': weather_impact,
-            'yield_prediction': yield_prediction,
-            'rotation_plan': rotation_text,
-            'price_forecast': price_forecast,
-            'management': management
+            'weather_impact': weather_impacts[crop_type],
+            'yield_prediction': results[(i, 'yield')],
+            'rotation_plan': results[(i, 'rotation')],
+            'price_forecast': results[(i, 'price')],
+            'management': results[(i, 'management')]
         })
+        if (results[(i, 'yield')] or {}).get('model_warming'):
+            complete = False
     
-    # Render recommendation template
-    return render_template(
-        'recommendation.html',
-        farm_data=farm_data,
-        crop_details=crop_details,
-        weather_forecast=weather_forecast.to_dict('records')
-    )
+    return crop_details, weather_forecast.to_dict('records'), complete
 
-@app.route('/charts/price_trends')
-def price_trend_chart():
-    """Generate price trend chart for crops"""
+def _selected_crops():
+    """Sorted, de-duplicated crops from the ``crops`` query argument"""
     selected_crops = request.args.get('crops', '').split(',')
     if not selected_crops or selected_crops[0] == '':
         selected_crops = crops[:3]  # Default to first 3 crops
-    
+    return tuple(sorted(set(selected_crops)))
+
+def _chart_response(payload, mimetype='application/json'):
+    """Serve a cached chart payload, answering revalidations with 304 and
+    sending the gzip copy to clients that accept it"""
+    response = app.response_class(mimetype=mimetype)
+    response.set_etag(payload.etag, weak=True)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Browsers keep the payload but check the ETag before reusing it
+    response.cache_control.no_cache = True
+    if request.if_none_match.contains_weak(payload.etag):
+        response.status_code = 304
+        return response
+    if payload.gzipped is not None and request.accept_encodings['gzip'] > 0:
+        response.set_data(payload.gzipped)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response.set_data(payload.body)
+    return response
+
+@app.route('/charts/price_trends')
+def price_trend_chart():
+    """Generate price trend chart for crops"""
+    selected_crops = _selected_crops()
+    points = request.args.get('points', PRICE_CHART_POINTS, type=int)
+    points = min(max(points, 3), PRICE_CHART_MAX_POINTS)
+    method = request.args.get('method', 'lttb')
+    if method not in METHODS:
+        method = 'lttb'
+    period = request.args.get('aggregate')
+    if period not in PERIODS:
+        period = None
+    payload = chart_cache.get_or_build(
+        'price_trends', (selected_crops, points, method, period), registry.version("markets"),
+        lambda: _price_trend_json(selected_crops, points, method, period)
+    )
+    return _chart_response(payload)
+
+def _price_trend_json(selected_crops, points=PRICE_CHART_POINTS, method='lttb', period=None):
     # Filter data for selected crops and prepare for plotting
     # Using 'Product' instead of 'Crop_Type'
     df = market_data[market_data['Product'].isin(selected_crops)].copy()
+    # Plotly groups by every category of a categorical column, including unselected ones
+    df['Product'] = df['Product'].astype(str)
     
     # Create a dummy date column based on Market_ID for temporal visualization
     # This is a workaround since our market data doesn't have actual dates
     df['dummy_date'] = pd.to_datetime('2023-01-01') + pd.to_timedelta(df['Market_ID'], unit='D')
+    df = df[['Product', 'dummy_date', 'Market_Price_per_ton']]
+    
+    # Keep the payload bounded however much market history is loaded
+    if period:
+        df = aggregate_series(df, 'dummy_date', 'Market_Price_per_ton', period, group='Product')
+    df = downsample(df, 'dummy_date', 'Market_Price_per_ton', points, group='Product', method=method)
     
     # Create the price trend chart
     fig = px.line(
@@ -219,13 +347,17 @@ def price_trend_chart():
 @app.route('/charts/sustainability')
 def sustainability_chart():
     """Generate sustainability comparison chart"""
-    selected_crops = request.args.get('crops', '').split(',')
-    if not selected_crops or selected_crops[0] == '':
-        selected_crops = crops[:3]  # Default to first 3 crops
-    
+    selected_crops = _selected_crops()
+    payload = chart_cache.get_or_build(
+        'sustainability', selected_crops, registry.version("farms"),
+        lambda: _sustainability_json(selected_crops)
+    )
+    return _chart_response(payload)
+
+def _sustainability_json(selected_crops):
     # Calculate average sustainability scores by crop
     df = farm_data[farm_data['Crop_Type'].isin(selected_crops)].copy()
-    sustainability = df.groupby('Crop_Type')['Sustainability_Score'].mean().reset_index()
+    sustainability = df.groupby('Crop_Type', observed=True)['Sustainability_Score'].mean().reset_index()
     
     # Create the chart - use a radar chart to show multiple dimensions
     # For a demo, create distinct sub-scores for each crop
@@ -297,7 +429,12 @@ def sustainability_chart():
 def weather_page():
     """Display weather data and forecasts"""
     location = request.args.get('location', locations[0])
-    
+    # The page changes with the forecast month and with stored station records
+    version = (str(weather._current_month().date()), weather.source.cache_token(location))
+    payload = chart_cache.get_or_build('weather', location, version, lambda: _render_weather_page(location))
+    return _chart_response(payload, mimetype='text/html')
+
+def _render_weather_page(location):
     # Get historical weather data
     historical = weather.get_historical_weather(location, months_back=6)
     
@@ -0,0 +1,87 @@
+import threading
+import logging
+
+import numpy as np
+
+from utils.datasets import registry as default_registry
+
+
+class DashboardStats:
+    """Dashboard figures computed once per dataset version and kept in memory.
+
+    Farm aggregates (distinct farm IDs, yield and sustainability sums,
+    per-crop sums and counts) and the first listing per product are built
+    on first use. A registry reload discards only the part built from the
+    reloaded dataset, which is recomputed in full on the next :meth:`get`.
+    """
+
+    def __init__(self, registry=None, top_n=5):
+        self.registry = registry or default_registry
+        self.top_n = top_n
+        self._farms = None
+        self._markets = None
+        self._versions = {"farms": 0, "markets": 0}
+        self._lock = threading.RLock()
+        self.registry.on_reload(self._on_dataset_reload)
+
+    def _on_dataset_reload(self, name):
+        with self._lock:
+            if name == "farms":
+                self._farms = None
+            elif name == "markets":
+                self._markets = None
+
+    @staticmethod
+    def _farm_aggregates(df):
+        by_crop = df.groupby('Crop_Type', observed=True)['Crop_Yield_ton'].agg(['sum', 'count'])
+        by_crop.index = by_crop.index.astype(str)
+        return {
+            "farm_ids": np.unique(df['Farm_ID'].to_numpy()),
+            "rows": len(df),
+            "yield_sum": df['Crop_Yield_ton'].sum(),
+            "sustainability_sum": df['Sustainability_Score'].sum(),
+            "by_crop": by_crop,
+        }
+
+    @staticmethod
+    def _market_aggregates(df):
+        # Earliest listing per product, as the dashboard has no dates
+        first = (
+            df[['Product', 'Market_ID', 'Market_Price_per_ton']]
+            .sort_values('Market_ID')
+            .drop_duplicates(subset=['Product'])
+        )
+        return first.assign(Product=first['Product'].astype(str))
+
+    def _farm_stats(self):
+        if self._farms is None:
+            self._farms = self._farm_aggregates(self.registry.get("farms"))
+            self._versions["farms"] += 1
+            logging.info("Computed farm dashboard statistics")
+        return self._farms
+
+    def _market_stats(self):
+        if self._markets is None:
+            self._markets = self._market_aggregates(self.registry.get("markets"))
+            self._versions["markets"] += 1
+            logging.info("Computed market dashboard statistics")
+        return self._markets
+
+    def get(self):
+        """Dashboard figures as plain Python values"""
+        with self._lock:
+            farms = self._farm_stats()
+            markets = self._market_stats()
+            versions = dict(self._versions)
+
+        rows = max(farms["rows"], 1)
+        top_crops = (farms["by_crop"]["sum"] / farms["by_crop"]["count"]).sort_values(ascending=False).head(self.top_n)
+        recent_prices = markets.head(self.top_n).set_index('Product')['Market_Price_per_ton']
+        return {
+            "total_farms": int(len(farms["farm_ids"])),
+            "avg_yield": round(float(farms["yield_sum"] / rows), 2),
+            "avg_sustainability": round(float(farms["sustainability_sum"] / rows), 2),
+            "top_crops": {crop: float(value) for crop, value in top_crops.items()},
+            "recent_prices": {product: float(price) for product, price in recent_prices.items()},
+            "versions": versions,
+        }
@@ -1,11 +1,29 @@
-import pandas as pd
+import numpy as np
 import re
-from core.sustainability import calculate_sustainability_score
+from core.sustainability import calculate_sustainability_scores
+from utils.datasets import registry
 
 class DecisionEngine:
-    def __init__(self, agents):
+    def __init__(self, agents, top_k=3, ph_window=0.5):
         self.agents = agents
-        self.data = pd.read_csv("data/farmer_advisor_dataset.csv")
+        self.top_k = top_k
+        self.ph_window = ph_window
+        self.data = registry.get("farms")
+        self._build_ph_index()
+        registry.on_reload(self._on_dataset_reload)
+
+    def _on_dataset_reload(self, name):
+        if name == "farms":
+            self.data = registry.get("farms")
+            self._build_ph_index()
+
+    def _build_ph_index(self):
+        """Sort farms by Soil_pH once, with their sustainability scores, so
+        range queries become two binary searches instead of a full scan"""
+        order = np.argsort(self.data["Soil_pH"].to_numpy(), kind="stable")
+        self._sorted_ph = self.data["Soil_pH"].to_numpy()[order]
+        self._sorted_scores = calculate_sustainability_scores(self.data)[order]
+        self._sorted_crops = np.asarray(self.data["Crop_Type"], dtype=object)[order]
 
     def run(self, message):
         query = message.get("query", "").lower()
@@ -23,19 +41,22 @@ class DecisionEngine:
         return {"response": "Query not understood."}
 
     def _recommend_by_ph(self, target_ph):
-        # Filter crops with similar pH range (±0.5)
-        subset = self.data[
-            (self.data["Soil_pH"] >= target_ph - 0.5) &
-            (self.data["Soil_pH"] <= target_ph + 0.5)
-        ].copy()  # Create a copy to avoid the SettingWithCopyWarning
+        # Rows with pH in [target - window, target + window] form one contiguous slice
+        lo = np.searchsorted(self._sorted_ph, target_ph - self.ph_window, side="left")
+        hi = np.searchsorted(self._sorted_ph, target_ph + self.ph_window, side="right")
 
-        if subset.empty:
+        if hi <= lo:
             return {"response": "No valid recommendations found."}
 
-        # Calculate sustainability scores using loc to avoid the warning
-        subset.loc[:, "Sustainability_Score"] = subset.apply(calculate_sustainability_score, axis=1)
-        top_crops = subset.sort_values(by="Sustainability_Score", ascending=False).head(3)
+        # Partial top-k: only the k best scores in the slice are fully sorted
+        scores = self._sorted_scores[lo:hi]
+        k = min(self.top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
 
         return {
-            "recommendation": top_crops[["Crop_Type", "Sustainability_Score"]].to_dict(orient="records")
+            "recommendation": [
+                {"Crop_Type": self._sorted_crops[lo + i], "Sustainability_Score": float(scores[i])}
+                for i in top
+            ]
         }
@@ -0,0 +1,116 @@
+import numpy as np
+
+
+class FlatForest:
+    """A fitted scikit-learn tree ensemble compiled into packed node arrays.
+
+    Every tree's nodes are concatenated into flat ``feature``, ``threshold``,
+    ``left``, ``right`` and ``value`` arrays. Leaves point back at themselves,
+    so all rows walk all trees at once for ``max_depth`` vectorized steps.
+    Results match ``RandomForestRegressor.predict`` exactly: inputs are cast
+    to float32 as sklearn does, and tree outputs are summed in estimator
+    order before averaging.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, value,
+                 roots, max_depth, n_features, mean=None, scale=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None):
+        """Compile ``model`` (a fitted forest or single tree regressor).
+
+        If a fitted StandardScaler is given its transform is applied inside
+        :meth:`predict`, so callers can pass raw feature values.
+        """
+        estimators = getattr(model, "estimators_", None) or [model]
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            nodes = np.arange(offset, offset + n_nodes)
+            is_leaf = tree.children_left == -1
+
+            feature = np.where(is_leaf, 0, tree.feature)
+            # A leaf compares against +inf and loops back to itself either way
+            threshold = np.where(is_leaf, np.inf, tree.threshold)
+            left = np.where(is_leaf, nodes, tree.children_left + offset)
+            right = np.where(is_leaf, nodes, tree.children_right + offset)
+            go_left = getattr(tree, "missing_go_to_left", None)
+            if go_left is None:
+                go_left = np.zeros(n_nodes, dtype=bool)
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            missing.append(np.asarray(go_left, dtype=bool))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        mean = scale = None
+        if scaler is not None:
+            mean = getattr(scaler, "mean_", None)
+            scale = getattr(scaler, "scale_", None)
+
+        return cls(
+            np.concatenate(features).astype(np.intp),
+            np.concatenate(thresholds).astype(np.float64),
+            np.concatenate(lefts).astype(np.intp),
+            np.concatenate(rights).astype(np.intp),
+            np.concatenate(missing),
+            np.concatenate(values).astype(np.float64),
+            np.asarray(roots, dtype=np.intp),
+            max_depth,
+            estimators[0].n_features_in_,
+            mean,
+            scale,
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left,
+                                      self.right, self.missing_left, self.value, self.roots))
+
+    def predict(self, X):
+        """Average tree output for each row of ``X`` (n_rows x n_features)"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        # Same operations, in the same order, as StandardScaler.transform
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        flat = X.astype(np.float32).astype(np.float64).ravel()
+
+        row_offsets = (np.arange(len(X)) * self.n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.max_depth):
+            x = flat[row_offsets + self.feature[nodes]]
+            go_left = np.where(np.isnan(x), self.missing_left[nodes], x <= self.threshold[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        # cumsum adds trees one at a time, like sklearn's accumulation
+        totals = np.cumsum(self.value[nodes], axis=1)[:, -1]
+        return totals / self.n_trees
@@ -0,0 +1,161 @@
+import sys
+import threading
+import logging
+from collections import OrderedDict
+
+
+def estimate_size(obj):
+    """Approximate resident size of a fitted model in bytes.
+
+    Tree ensembles are measured by their node and value arrays, which
+    dominate their footprint; objects exposing ``nbytes`` (arrays, compiled
+    forests) report that; anything else falls back to sys.getsizeof.
+    """
+    estimators = getattr(obj, "estimators_", None)
+    if estimators is not None:
+        return sum(estimate_size(est) for est in estimators)
+    tree = getattr(obj, "tree_", None)
+    if tree is not None:
+        state = tree.__getstate__()
+        return state["nodes"].nbytes + state["values"].nbytes
+    if isinstance(obj, dict):
+        return sum(estimate_size(value) for value in obj.values())
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return sys.getsizeof(obj)
+
+
+class ModelRegistry:
+    """Lazily loaded, size-bounded LRU cache of per-key models.
+
+    ``loader(key)`` is called on a miss and returns the entry to cache, or
+    None when no model can be produced. Least recently used entries are
+    evicted once more than ``max_models`` are held or their estimated size
+    exceeds ``memory_budget_bytes``; the most recent entry is always kept.
+    """
+
+    def __init__(self, loader, max_models=None, memory_budget_bytes=None, sizer=estimate_size):
+        self.loader = loader
+        self.max_models = max_models
+        self.memory_budget_bytes = memory_budget_bytes
+        self.sizer = sizer
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self._listeners = []
+        self._stats = {"hits": 0, "misses": 0, "loads": 0, "load_failures": 0, "evictions": 0}
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def peek(self, key):
+        """Return the cached entry without loading or touching LRU order"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def get(self, key):
+        """Return the entry for ``key``, loading it on first use"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._entries[key]
+            self._stats["misses"] += 1
+
+        # Load outside the registry lock so other keys stay available, but
+        # make concurrent requests for the same key wait for a single load
+        with self._key_lock(key):
+            entry = self.peek(key)
+            if entry is not None:
+                return entry
+            try:
+                entry = self.loader(key)
+            except Exception as e:
+                logging.error(f"Model load failed for {key}: {e}")
+                entry = None
+            if entry is None:
+                with self._lock:
+                    self._stats["load_failures"] += 1
+                return None
+            with self._lock:
+                self._stats["loads"] += 1
+            # A cache fill serves the same model as before, so listeners
+            # are not told about it
+            self._store(key, entry)
+            return entry
+
+    def _store(self, key, entry):
+        size = self.sizer(entry)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._evict()
+
+    def put(self, key, entry):
+        """Insert or atomically replace the entry for ``key`` with a new model"""
+        self._store(key, entry)
+        self._notify(key)
+
+    def on_change(self, callback):
+        """Call ``callback(key)`` after :meth:`put` stores a new model or an
+        entry is invalidated (``key`` is None when everything was
+        invalidated). Lazy loads and refills after eviction don't notify."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def _notify(self, key):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(key)
+            except Exception as e:
+                logging.error(f"Model registry listener failed for {key}: {e}")
+
+    def _evict(self):
+        while len(self._entries) > 1 and (
+            (self.max_models is not None and len(self._entries) > self.max_models)
+            or (self.memory_budget_bytes is not None and sum(self._sizes.values()) > self.memory_budget_bytes)
+        ):
+            key, _ = self._entries.popitem(last=False)
+            self._sizes.pop(key, None)
+            self._stats["evictions"] += 1
+            logging.info(f"Evicted model for {key} from the model cache")
+
+    def invalidate(self, key=None):
+        """Drop one entry, or all of them, so the next get() reloads"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._sizes.clear()
+            else:
+                self._entries.pop(key, None)
+                self._sizes.pop(key, None)
+        self._notify(key)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def items(self):
+        """Snapshot of (key, entry) pairs currently held"""
+        with self._lock:
+            return list(self._entries.items())
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def stats(self):
+        """Hit/miss/eviction counters plus current occupancy"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["models"] = len(self._entries)
+            stats["bytes"] = sum(self._sizes.values())
+        stats["max_models"] = self.max_models
+        stats["memory_budget_bytes"] = self.memory_budget_bytes
+        return stats
@@ -0,0 +1,63 @@
+import os
+import json
+import hashlib
+import logging
+
+import joblib
+import numpy as np
+import sklearn
+
+FORMAT_VERSION = 1
+
+# zlib level 3 shrinks a 100-tree forest roughly threefold on disk
+DEFAULT_COMPRESSION = ("zlib", 3)
+
+
+def training_data_hash(X, y):
+    """SHA-256 over the feature names, feature values and targets a model was fitted on"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(X.columns)).encode())
+    digest.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    digest.update(np.ascontiguousarray(np.asarray(y, dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def make_header(model_file, feature_columns, data_hash, n_samples=None):
+    """Metadata stored beside a saved model so it can be vetted without loading it"""
+    return {
+        "format_version": FORMAT_VERSION,
+        "model_file": os.path.basename(model_file),
+        "sklearn_version": sklearn.__version__,
+        "feature_columns": list(feature_columns),
+        "training_data_hash": data_hash,
+        "n_samples": n_samples,
+    }
+
+
+def header_problem(header, feature_columns=None, data_hash=None):
+    """Why a saved model can't be reused, or None if its header checks out"""
+    if not header:
+        return "no model header"
+    if header.get("format_version") != FORMAT_VERSION:
+        return f"format version {header.get('format_version')} != {FORMAT_VERSION}"
+    if header.get("sklearn_version") != sklearn.__version__:
+        return f"saved with scikit-learn {header.get('sklearn_version')}, running {sklearn.__version__}"
+    if feature_columns is not None and header.get("feature_columns") != list(feature_columns):
+        return "feature columns changed"
+    if data_hash is not None and header.get("training_data_hash") != data_hash:
+        return "training data changed"
+    return None
+
+
+def save_model(path, model, scaler, compress=DEFAULT_COMPRESSION):
+    """Write model and scaler to one compressed joblib file, atomically"""
+    tmp = path + ".tmp"
+    joblib.dump({"model": model, "scaler": scaler}, tmp, compress=compress)
+    os.replace(tmp, path)
+    logging.info(f"Saved model to {path} ({os.path.getsize(path)} bytes)")
+
+
+def load_model(path):
+    """Return the (model, scaler) pair written by :func:`save_model`"""
+    stored = joblib.load(path)
+    return stored["model"], stored["scaler"]
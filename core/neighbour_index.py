@@ -0,0 +1,64 @@
+import itertools
+import numpy as np
+import logging
+
+
+class NeighbourIndex:
+    """Grid index over a few numeric columns for box and nearest-neighbour queries.
+
+    Each column is scaled by its query half-width, so a box query
+    ``value ± half_width`` spans at most three grid cells per dimension and
+    only rows in those cells are checked exactly. A KD-tree over the same
+    scaled coordinates is built lazily for k-nearest-neighbour lookups.
+    """
+
+    def __init__(self, data, columns, half_widths):
+        self.columns = list(columns)
+        self.half_widths = np.asarray(half_widths, dtype=np.float64)
+        self.values = np.column_stack([data[c].to_numpy(dtype=np.float64) for c in self.columns])
+        self._scaled = self.values / self.half_widths
+        self._tree = None
+
+        cells = np.floor(self._scaled).astype(np.int64)
+        order = np.lexsort(cells.T[::-1])
+        sorted_cells = cells[order]
+        # Boundaries where the cell changes split `order` into per-cell buckets
+        breaks = np.flatnonzero(np.any(np.diff(sorted_cells, axis=0) != 0, axis=1)) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [len(order)]))
+        self._buckets = {
+            tuple(sorted_cells[s].tolist()): order[s:e] for s, e in zip(starts, ends)
+        }
+        logging.info(f"Built neighbour index over {self.columns}: {len(self.values)} rows in {len(self._buckets)} cells")
+
+    def box_query(self, center):
+        """Row positions (ascending) with every column within its half-width of ``center``"""
+        center = np.asarray(center, dtype=np.float64)
+        low = center - self.half_widths
+        high = center + self.half_widths
+        lo_cell = np.floor(low / self.half_widths).astype(np.int64)
+        hi_cell = np.floor(high / self.half_widths).astype(np.int64)
+
+        ranges = [range(a, b + 1) for a, b in zip(lo_cell.tolist(), hi_cell.tolist())]
+        candidates = [
+            self._buckets[key] for key in itertools.product(*ranges) if key in self._buckets
+        ]
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+
+        positions = np.concatenate(candidates)
+        rows = self.values[positions]
+        inside = np.all((rows >= low) & (rows <= high), axis=1)
+        return np.sort(positions[inside])
+
+    def nearest(self, center, k):
+        """Row positions (ascending) of the ``k`` rows closest to ``center`` in scaled units"""
+        if self._tree is None:
+            from sklearn.neighbors import KDTree
+            self._tree = KDTree(self._scaled)
+        k = min(k, len(self._scaled))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        scaled = np.asarray(center, dtype=np.float64) / self.half_widths
+        _, idx = self._tree.query(scaled.reshape(1, -1), k=k)
+        return np.sort(idx[0])
@@ -1,3 +1,5 @@
+import numpy as np
+
 def calculate_sustainability_score(row):
     score = 0
     score += (1 - abs(row["Soil_pH"] - 6.5) / 6.5) * 25
@@ -5,3 +7,18 @@ def calculate_sustainability_score(row):
     score += (1 - abs(row["Temperature_C"] - 30) / 30) * 25
     score += (1 - abs(row["Rainfall_mm"] - 100) / 100) * 25
     return max(0, min(score, 100))
+
+def calculate_sustainability_scores(df):
+    """Vectorized calculate_sustainability_score over a DataFrame (or any
+    mapping of column name to array); returns a float64 NumPy array"""
+    soil_ph = np.asarray(df["Soil_pH"], dtype=np.float64)
+    moisture = np.asarray(df["Soil_Moisture"], dtype=np.float64)
+    temperature = np.asarray(df["Temperature_C"], dtype=np.float64)
+    rainfall = np.asarray(df["Rainfall_mm"], dtype=np.float64)
+
+    # Same term order as the scalar version so results match bit for bit
+    score = (1 - np.abs(soil_ph - 6.5) / 6.5) * 25
+    score += (1 - np.abs(moisture - 25) / 25) * 25
+    score += (1 - np.abs(temperature - 30) / 30) * 25
+    score += (1 - np.abs(rainfall - 100) / 100) * 25
+    return np.clip(score, 0, 100)
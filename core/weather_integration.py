@@ -1,11 +1,16 @@
 import pandas as pd
 import numpy as np
 import datetime
-from dateutil.relativedelta import relativedelta
 import logging
+import threading
+
+from core.weather_sources import SimulatedWeatherSource
 
 class WeatherIntegration:
-    def __init__(self):
+    # Growing season length used for yield impact (4 months)
+    SEASON_DAYS = 120
+
+    def __init__(self, seed=42, source=None):
         # Simulated weather stations with their baseline climate characteristics
         self.weather_stations = {
             "Karimnagar": {"base_temp": 28, "base_rainfall": 900, "base_humidity": 65, "season_amplitude": 6},
@@ -35,59 +40,64 @@ class WeatherIntegration:
             "Soybean": {"temp": [22, 30], "rainfall": [800, 1200], "humidity": [55, 70]}
         }
         
-        # Initialize random seed for reproducibility
-        np.random.seed(42)
+        # Forecasts are always simulated; historical data comes from
+        # ``source`` (e.g. a StoreWeatherSource) when it covers the location
+        self.simulator = SimulatedWeatherSource(self.weather_stations, seed)
+        self.source = source or self.simulator
+
+        # Weather series keyed by (kind, location, month, horizon, source version)
+        self._cache = {}
+        self._cache_month = None
+        self._cache_lock = threading.Lock()
     
+    def _current_month(self):
+        """First day of the current month; every simulation is anchored to it"""
+        return pd.Timestamp(datetime.date.today().replace(day=1))
+
+    def _memoized(self, key, build):
+        """Return a copy of the cached frame for ``key``, building it once.
+        The cache only holds entries for the current month."""
+        anchor = key[2]
+        with self._cache_lock:
+            if self._cache_month != anchor:
+                self._cache.clear()
+                self._cache_month = anchor
+            frame = self._cache.get(key)
+        if frame is None:
+            frame = build()
+            with self._cache_lock:
+                if self._cache_month == anchor:
+                    self._cache[key] = frame
+        return frame.copy()
+
+    def _resolve_location(self, location):
+        if location not in self.weather_stations:
+            logging.warning(f"Unknown location: {location}. Using default weather patterns.")
+            location = next(iter(self.weather_stations))
+        return location
+
     def get_historical_weather(self, location, months_back=12):
         """
-        Get simulated historical weather data for a location
+        Get monthly historical weather data for a location
         
         Parameters:
-        - location: Name of the location (must be in weather_stations)
-        - months_back: How many months of historical data to generate
+        - location: Name of the location (in weather_stations or the source)
+        - months_back: How many months of historical data to return
         
         Returns:
-        - DataFrame with simulated historical weather data
+        - DataFrame with historical weather data, simulated unless the
+          configured source has records for the location
         """
-        if location not in self.weather_stations:
-            logging.warning(f"Unknown location: {location}. Using default weather patterns.")
-            location = next(iter(self.weather_stations))
-        
-        # Get base values for the location
-        base = self.weather_stations[location]
-        
-        # Generate dates from past to present
-        end_date = datetime.datetime.now().replace(day=1)
-        start_date = end_date - relativedelta(months=months_back)
-        dates = pd.date_range(start=start_date, end=end_date, freq='MS')
-        
-        # Create weather dataframe
-        weather_data = []
-        
-        for date in dates:
-            # Calculate seasonal adjustments (simple sine wave pattern)
-            month = date.month
-            season_factor = np.sin(np.pi * (month - 3) / 6)  # Peak in July, low in January
-            
-            # Add some randomness
-            temp_random = np.random.normal(0, 1.5)
-            rainfall_random = np.random.normal(0, 50)
-            humidity_random = np.random.normal(0, 5)
-            
-            # Calculate weather values with seasonal and random factors
-            temp = base["base_temp"] + base["season_amplitude"] * season_factor + temp_random
-            rainfall = max(0, base["base_rainfall"] * (1 + 0.3 * season_factor) + rainfall_random)
-            humidity = min(100, max(10, base["base_humidity"] + 10 * season_factor + humidity_random))
-            
-            weather_data.append({
-                "date": date,
-                "location": location,
-                "temperature_C": round(temp, 1),
-                "rainfall_mm": round(rainfall, 0),
-                "humidity_pct": round(humidity, 0)
-            })
-        
-        return pd.DataFrame(weather_data)
+        source = self.source if self.source.has_station(location) else self.simulator
+        if source is self.simulator:
+            location = self._resolve_location(location)
+        anchor = self._current_month()
+
+        # Months from past to present
+        start = anchor - pd.DateOffset(months=months_back)
+        build = lambda: source.monthly_history(location, start, anchor)
+        key = ("historical", location, anchor, months_back, source.cache_token(location))
+        return self._memoized(key, build)
     
     def get_weather_forecast(self, location, months_ahead=3):
         """
@@ -100,50 +110,92 @@ class WeatherIntegration:
         Returns:
         - DataFrame with simulated forecast data
         """
-        # Use similar logic as historical data but with increased uncertainty
-        if location not in self.weather_stations:
-            logging.warning(f"Unknown location: {location}. Using default weather patterns.")
-            location = next(iter(self.weather_stations))
+        location = self._resolve_location(location)
+        anchor = self._current_month()
+
+        def build():
+            # Generate dates from present to future
+            dates = pd.date_range(start=anchor + pd.DateOffset(months=1), periods=months_ahead + 1, freq='MS')
+            steps = np.arange(len(dates))
+            # Uncertainty increases with forecast distance
+            rng = self.simulator.rng(location, anchor, "forecast")
+            forecast = self.simulator.simulate(location, dates, rng, 1 + steps * 0.2)
+            forecast["confidence"] = np.maximum(20, 100 - steps * 20)  # Confidence decreases with time
+            return forecast
+
+        return self._memoized(("forecast", location, anchor, months_ahead), build)
+    
+    def _has_records(self, location):
+        """True if the configured source stores daily records for ``location``"""
+        return self.source is not self.simulator and self.source.has_station(location)
+
+    def get_daily_weather(self, location, start, end):
+        """
+        Get daily weather for a location from ``start`` to ``end`` inclusive
         
-        # Get base values for the location
-        base = self.weather_stations[location]
+        Days the configured source has records for use them; every other day
+        (including future days) is simulated.
         
-        # Generate dates from present to future
-        start_date = datetime.datetime.now().replace(day=1) + relativedelta(months=1)
-        end_date = start_date + relativedelta(months=months_ahead)
-        dates = pd.date_range(start=start_date, end=end_date, freq='MS')
+        Returns:
+        - DataFrame with one row per day
+        """
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        recorded = self._has_records(location)
+        sim_location = location if location in self.weather_stations else self._resolve_location(location)
+
+        daily = self.simulator.daily_history(sim_location, start, end)
+        daily["location"] = location if recorded else sim_location
+        if recorded:
+            records = self.source.daily_history(location, start, end)
+            positions = daily["date"].searchsorted(records["date"])
+            for column in ["temperature_C", "rainfall_mm", "humidity_pct"]:
+                values = daily[column].to_numpy(copy=True)
+                values[positions] = records[column].to_numpy()
+                daily[column] = values
+        return daily
+
+    def planting_window_aggregates(self, location, planting_dates, season_days=SEASON_DAYS,
+                                   base_temp=10.0, humidity_limits=(40, 85)):
+        """
+        Season aggregates for many planting-date scenarios at one location
         
-        # Create forecast dataframe with increasing uncertainty
-        forecast_data = []
+        Each planting date opens a ``season_days`` window. Window sums come
+        from prefix sums over a single daily series, so thousands of
+        scenarios cost about as much as one.
         
-        for i, date in enumerate(dates):
-            # Calculate seasonal adjustments (simple sine wave pattern)
-            month = date.month
-            season_factor = np.sin(np.pi * (month - 3) / 6)  # Peak in July, low in January
-            
-            # Add increasing randomness based on how far in the future
-            uncertainty_factor = 1 + i * 0.2  # Uncertainty increases with forecast distance
-            temp_random = np.random.normal(0, 1.5 * uncertainty_factor)
-            rainfall_random = np.random.normal(0, 50 * uncertainty_factor)
-            humidity_random = np.random.normal(0, 5 * uncertainty_factor)
-            
-            # Calculate weather values with seasonal and random factors
-            temp = base["base_temp"] + base["season_amplitude"] * season_factor + temp_random
-            rainfall = max(0, base["base_rainfall"] * (1 + 0.3 * season_factor) + rainfall_random)
-            humidity = min(100, max(10, base["base_humidity"] + 10 * season_factor + humidity_random))
-            
-            forecast_data.append({
-                "date": date,
-                "location": location,
-                "temperature_C": round(temp, 1),
-                "rainfall_mm": round(rainfall, 0),
-                "humidity_pct": round(humidity, 0),
-                "confidence": round(max(20, 100 - i * 20), 0)  # Confidence decreases with time
-            })
-        
-        return pd.DataFrame(forecast_data)
-    
-    def calculate_yield_impact(self, crop, location, planting_date):
+        Parameters:
+        - location: Growing location
+        - planting_dates: One date or a sequence of dates
+        - season_days: Length of the growing window in days
+        - base_temp: Base temperature for growing degree days
+        - humidity_limits: (low, high) humidity outside which a day counts as stressed
+        
+        Returns:
+        - DataFrame indexed by planting_date with growing_degree_days,
+          cumulative_rainfall_mm, humidity_stress_days, avg_temperature_C and
+          avg_humidity_pct columns
+        """
+        dates = pd.DatetimeIndex(pd.to_datetime(np.atleast_1d(planting_dates))).normalize()
+        start = dates.min()
+        daily = self.get_daily_weather(location, start, dates.max() + pd.Timedelta(days=season_days - 1))
+        offsets = (dates - start).days.to_numpy()
+
+        def window_sum(values):
+            totals = np.concatenate(([0.0], np.cumsum(values)))
+            return totals[offsets + season_days] - totals[offsets]
+
+        temp = daily["temperature_C"].to_numpy()
+        humidity = daily["humidity_pct"].to_numpy()
+        low, high = humidity_limits
+        return pd.DataFrame({
+            "growing_degree_days": window_sum(np.maximum(temp - base_temp, 0)),
+            "cumulative_rainfall_mm": window_sum(daily["rainfall_mm"].to_numpy()),
+            "humidity_stress_days": window_sum((humidity < low) | (humidity > high)).astype(int),
+            "avg_temperature_C": window_sum(temp) / season_days,
+            "avg_humidity_pct": window_sum(humidity) / season_days
+        }, index=pd.Index(dates, name="planting_date"))
+
+    def calculate_yield_impact(self, crop, location, planting_date, resolution="monthly"):
         """
         Calculate the expected impact of weather on crop yield
         
@@ -151,91 +203,127 @@ class WeatherIntegration:
         - crop: Crop type
         - location: Growing location
         - planting_date: When the crop will be planted
+        - resolution: "monthly" scores the 4-month forecast; "daily" scores
+          the daily window starting at planting_date
         
         Returns:
         - Dictionary with yield impact factors and explanation
         """
-        if crop not in self.crop_weather_sensitivity:
-            logging.warning(f"Unknown crop: {crop}. Cannot calculate yield impact.")
-            return {
-                "impact_factor": 1.0,
-                "explanation": "No weather impact data available for this crop."
-            }
-            
-        if location not in self.weather_stations:
-            logging.warning(f"Unknown location: {location}. Using default weather patterns.")
-            location = next(iter(self.weather_stations))
-        
-        # Get forecast for growing season (assume 4 months)
+        return self.calculate_yield_impact_many([crop], location, planting_date, resolution)[crop]
+
+    def _season_aggregates(self, location):
+        """Average temperature, seasonal rainfall total and average humidity
+        over the 4-month growing-season forecast"""
         forecast = self.get_weather_forecast(location, 4)
+        return np.array([
+            forecast["temperature_C"].mean(),
+            forecast["rainfall_mm"].mean() * 4,  # Total for the season
+            forecast["humidity_pct"].mean()
+        ])
+
+    def _variation(self, crop, location):
+        """Small per-crop random factor for natural variation, fixed for the
+        month so single and batched calls agree"""
+        return self.simulator.rng(location, self._current_month(), f"impact:{crop}").uniform(0.95, 1.05)
+
+    def calculate_yield_impact_many(self, crops, location, planting_date, resolution="monthly"):
+        """
+        Calculate the weather impact on yield for several crops at once
         
+        The growing-season forecast is aggregated once and every crop is
+        scored against its optimal conditions in one matrix operation.
+        
+        Parameters:
+        - crops: Iterable of crop types
+        - location: Growing location
+        - planting_date: When the crops will be planted
+        - resolution: "monthly" or "daily", as for calculate_yield_impact
+        
+        Returns:
+        - Dictionary mapping each crop to the result of calculate_yield_impact
+        """
+        crops = list(crops)
+        results = {}
+        known = []
+        for crop in crops:
+            if crop in self.crop_weather_sensitivity:
+                known.append(crop)
+            else:
+                logging.warning(f"Unknown crop: {crop}. Cannot calculate yield impact.")
+                results[crop] = {
+                    "impact_factor": 1.0,
+                    "explanation": "No weather impact data available for this crop."
+                }
+        if not known:
+            return {crop: results[crop] for crop in crops}
+
         # Calculate growing season based on planting date
         if isinstance(planting_date, str):
             planting_date = datetime.datetime.strptime(planting_date, "%Y-%m-%d")
         
-        # Get optimal conditions for the crop
-        optimal = self.crop_optimal_conditions[crop]
-        sensitivity = self.crop_weather_sensitivity[crop]
-        
-        # Calculate average conditions during growing season
-        avg_temp = forecast["temperature_C"].mean()
-        avg_rainfall = forecast["rainfall_mm"].mean() * 4  # Total for the season
-        avg_humidity = forecast["humidity_pct"].mean()
-        
-        # Calculate how far conditions are from optimal (0 = optimal, negative = below, positive = above)
-        temp_deviation = 0
-        if avg_temp < optimal["temp"][0]:
-            temp_deviation = (avg_temp - optimal["temp"][0]) / optimal["temp"][0]
-        elif avg_temp > optimal["temp"][1]:
-            temp_deviation = (avg_temp - optimal["temp"][1]) / optimal["temp"][1]
-            
-        rainfall_deviation = 0
-        if avg_rainfall < optimal["rainfall"][0]:
-            rainfall_deviation = (avg_rainfall - optimal["rainfall"][0]) / optimal["rainfall"][0]
-        elif avg_rainfall > optimal["rainfall"][1]:
-            rainfall_deviation = (avg_rainfall - optimal["rainfall"][1]) / optimal["rainfall"][1]
-            
-        humidity_deviation = 0
-        if avg_humidity < optimal["humidity"][0]:
-            humidity_deviation = (avg_humidity - optimal["humidity"][0]) / optimal["humidity"][0]
-        elif avg_humidity > optimal["humidity"][1]:
-            humidity_deviation = (avg_humidity - optimal["humidity"][1]) / optimal["humidity"][1]
-        
-        # Calculate impact factors (1.0 = no impact, <1.0 = negative impact, >1.0 = positive impact)
-        temp_impact = 1.0 - abs(temp_deviation) * sensitivity["temp"]
-        rainfall_impact = 1.0 - abs(rainfall_deviation) * sensitivity["rainfall"]
-        humidity_impact = 1.0 - abs(humidity_deviation) * sensitivity["humidity"]
-        
-        # Calculate overall impact as weighted average
-        overall_impact = (temp_impact + rainfall_impact + humidity_impact) / 3
-        # Add a small random factor for natural variation
-        overall_impact = overall_impact * np.random.uniform(0.95, 1.05)
-        overall_impact = max(0.5, min(1.5, overall_impact))  # Cap between 50% and 150%
-        
-        # Prepare explanation
-        explanation = []
-        if temp_deviation < -0.1:
-            explanation.append(f"Temperature is expected to be colder than optimal ({avg_temp:.1f}°C)")
-        elif temp_deviation > 0.1:
-            explanation.append(f"Temperature is expected to be warmer than optimal ({avg_temp:.1f}°C)")
-            
-        if rainfall_deviation < -0.1:
-            explanation.append(f"Rainfall is expected to be lower than optimal ({avg_rainfall:.0f}mm)")
-        elif rainfall_deviation > 0.1:
-            explanation.append(f"Rainfall is expected to be higher than optimal ({avg_rainfall:.0f}mm)")
-            
-        if humidity_deviation < -0.1:
-            explanation.append(f"Humidity is expected to be lower than optimal ({avg_humidity:.0f}%)")
-        elif humidity_deviation > 0.1:
-            explanation.append(f"Humidity is expected to be higher than optimal ({avg_humidity:.0f}%)")
-            
-        if not explanation:
-            explanation.append("Weather conditions are near optimal for this crop")
-            
-        impact_text = "reduced" if overall_impact < 0.95 else "increased" if overall_impact > 1.05 else "normal"
+        # Average conditions during growing season: temperature, rainfall, humidity
+        extra = {}
+        if resolution == "daily":
+            # Stations known only to the weather source keep their own name
+            # so their stored daily records are used
+            window = self.planting_window_aggregates(location, planting_date).iloc[0]
+            if not self._has_records(location):
+                location = self._resolve_location(location)
+            conditions = window[["avg_temperature_C", "cumulative_rainfall_mm", "avg_humidity_pct"]].to_numpy(dtype=float)
+            extra = {
+                "growing_degree_days": round(float(window["growing_degree_days"]), 1),
+                "humidity_stress_days": int(window["humidity_stress_days"])
+            }
+            basis = f"daily weather for a season starting {planting_date:%Y-%m-%d}"
+        else:
+            location = self._resolve_location(location)
+            conditions = self._season_aggregates(location)
+            basis = "weather forecast"
+        factors = ["temp", "rainfall", "humidity"]
+        low = np.array([[self.crop_optimal_conditions[c][f][0] for f in factors] for c in known], dtype=float)
+        high = np.array([[self.crop_optimal_conditions[c][f][1] for f in factors] for c in known], dtype=float)
+        sensitivity = np.array([[self.crop_weather_sensitivity[c][f] for f in factors] for c in known])
+
+        # How far conditions are from optimal (0 = optimal, negative = below, positive = above)
+        deviation = np.where(
+            conditions < low, (conditions - low) / low,
+            np.where(conditions > high, (conditions - high) / high, 0.0)
+        )
         
-        return {
-            "impact_factor": round(overall_impact, 2),
-            "explanation": ". ".join(explanation),
-            "forecast_summary": f"Expected {impact_text} yield based on {location} weather forecast."
-        } 
\ No newline at end of file
+        # Impact factors (1.0 = no impact, <1.0 = negative impact, >1.0 = positive impact)
+        impact = 1.0 - np.abs(deviation) * sensitivity
+        overall = (impact[:, 0] + impact[:, 1] + impact[:, 2]) / 3
+        overall = overall * np.array([self._variation(c, location) for c in known])
+        overall = np.clip(overall, 0.5, 1.5)  # Cap between 50% and 150%
+
+        avg_temp, avg_rainfall, avg_humidity = conditions
+        for crop, (temp_deviation, rainfall_deviation, humidity_deviation), overall_impact in zip(known, deviation, overall):
+            # Prepare explanation
+            explanation = []
+            if temp_deviation < -0.1:
+                explanation.append(f"Temperature is expected to be colder than optimal ({avg_temp:.1f}°C)")
+            elif temp_deviation > 0.1:
+                explanation.append(f"Temperature is expected to be warmer than optimal ({avg_temp:.1f}°C)")
+                
+            if rainfall_deviation < -0.1:
+                explanation.append(f"Rainfall is expected to be lower than optimal ({avg_rainfall:.0f}mm)")
+            elif rainfall_deviation > 0.1:
+                explanation.append(f"Rainfall is expected to be higher than optimal ({avg_rainfall:.0f}mm)")
+                
+            if humidity_deviation < -0.1:
+                explanation.append(f"Humidity is expected to be lower than optimal ({avg_humidity:.0f}%)")
+            elif humidity_deviation > 0.1:
+                explanation.append(f"Humidity is expected to be higher than optimal ({avg_humidity:.0f}%)")
+                
+            if not explanation:
+                explanation.append("Weather conditions are near optimal for this crop")
+                
+            impact_text = "reduced" if overall_impact < 0.95 else "increased" if overall_impact > 1.05 else "normal"
+            
+            results[crop] = {
+                "impact_factor": round(float(overall_impact), 2),
+                "explanation": ". ".join(explanation),
+                "forecast_summary": f"Expected {impact_text} yield based on {location} {basis}.",
+                **extra
+            }
+        return {crop: results[crop] for crop in crops}
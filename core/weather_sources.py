@@ -0,0 +1,146 @@
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+class WeatherSource:
+    """Supplies historical weather for WeatherIntegration.
+
+    ``monthly_history`` returns one row per month start in ``[start, end]``
+    and ``daily_history`` one row per available day, both with date,
+    location, temperature_C, rainfall_mm and humidity_pct columns.
+    """
+
+    def has_station(self, location):
+        raise NotImplementedError("You need to implement this method")
+
+    def monthly_history(self, location, start, end):
+        raise NotImplementedError("You need to implement this method")
+
+    def daily_history(self, location, start, end):
+        raise NotImplementedError("You need to implement this method")
+
+    def cache_token(self, location):
+        """Value that changes when the data for ``location`` changes"""
+        return None
+
+
+class SimulatedWeatherSource(WeatherSource):
+    """Seasonal sine-wave weather with seeded noise for the built-in stations"""
+
+    def __init__(self, stations, seed=42):
+        self.stations = stations
+        self.seed = seed
+        self._years = {}
+        self._years_lock = threading.Lock()
+
+    def has_station(self, location):
+        return location in self.stations
+
+    def rng(self, location, anchor, kind):
+        """Generator seeded by location and month, so every call made during
+        the same month sees the same simulated weather"""
+        return np.random.default_rng(
+            [self.seed, zlib.crc32(location.encode()), anchor.year, anchor.month, zlib.crc32(kind.encode())]
+        )
+
+    def simulate(self, location, dates, rng, noise_scale):
+        """Seasonal baseline plus scaled Gaussian noise for every date at once"""
+        base = self.stations[location]
+        # Simple sine wave pattern: peak in July, low in January
+        season_factor = np.sin(np.pi * (dates.month.to_numpy() - 3) / 6)
+        noise = rng.normal(0, 1, size=(len(dates), 3)) * np.array([1.5, 50, 5]) * noise_scale[:, None]
+
+        temp = base["base_temp"] + base["season_amplitude"] * season_factor + noise[:, 0]
+        rainfall = np.maximum(0, base["base_rainfall"] * (1 + 0.3 * season_factor) + noise[:, 1])
+        humidity = np.clip(base["base_humidity"] + 10 * season_factor + noise[:, 2], 10, 100)
+
+        return pd.DataFrame({
+            "date": dates,
+            "location": location,
+            "temperature_C": np.round(temp, 1),
+            "rainfall_mm": np.round(rainfall, 0),
+            "humidity_pct": np.round(humidity, 0)
+        })
+
+    def monthly_history(self, location, start, end):
+        dates = pd.date_range(start=start, end=end, freq='MS')
+        return self.simulate(location, dates, self.rng(location, end, "historical"), np.ones(len(dates)))
+
+    def _simulate_year(self, location, year):
+        """Daily weather for one calendar year. Seeded by location and year
+        only, so a given day has the same value whatever range is requested."""
+        dates = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+        base = self.stations[location]
+        days_in_month = dates.days_in_month.to_numpy()
+        # The monthly sine wave, evaluated at fractional months
+        month = dates.month.to_numpy() + (dates.day.to_numpy() - 1) / days_in_month
+        season_factor = np.sin(np.pi * (month - 3) / 6)
+        noise = self.rng(location, pd.Timestamp(year=year, month=1, day=1), "daily").normal(0, 1, size=(len(dates), 3))
+
+        temp = base["base_temp"] + base["season_amplitude"] * season_factor + 1.5 * noise[:, 0]
+        # base_rainfall is a monthly total; spread it over the month's days
+        rainfall = np.maximum(0, (base["base_rainfall"] * (1 + 0.3 * season_factor) + 50 * noise[:, 1]) / days_in_month)
+        humidity = np.clip(base["base_humidity"] + 10 * season_factor + 5 * noise[:, 2], 10, 100)
+        return dates, np.column_stack([temp, rainfall, humidity])
+
+    def daily_history(self, location, start, end):
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        chunks = []
+        for year in range(start.year, end.year + 1):
+            key = (location, year)
+            with self._years_lock:
+                block = self._years.get(key)
+            if block is None:
+                block = self._simulate_year(location, year)
+                with self._years_lock:
+                    self._years[key] = block
+            dates, values = block
+            lo, hi = dates.searchsorted(start), dates.searchsorted(end, side="right")
+            chunks.append((dates[lo:hi], values[lo:hi]))
+
+        dates = chunks[0][0].append([d for d, _ in chunks[1:]]) if chunks else pd.DatetimeIndex([])
+        values = np.concatenate([v for _, v in chunks]) if chunks else np.empty((0, 3))
+        return pd.DataFrame({
+            "date": dates,
+            "location": location,
+            "temperature_C": values[:, 0],
+            "rainfall_mm": values[:, 1],
+            "humidity_pct": values[:, 2]
+        })
+
+
+class StoreWeatherSource(WeatherSource):
+    """Historical weather read from daily station records in a WeatherStore"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def has_station(self, location):
+        return self.store.has_station(location)
+
+    def cache_token(self, location):
+        return self.store.version(location)
+
+    def daily_history(self, location, start, end):
+        return self.store.read(location, start, end)
+
+    def monthly_history(self, location, start, end):
+        # ``end`` is a month start; include every day of that month
+        last_day = pd.Timestamp(end) + pd.offsets.MonthEnd(0)
+        daily = self.daily_history(location, start, last_day)
+        months = daily["date"].dt.to_period("M").dt.to_timestamp()
+        monthly = daily.groupby(months).agg(
+            temperature_C=("temperature_C", "mean"),
+            rainfall_mm=("rainfall_mm", "sum"),
+            humidity_pct=("humidity_pct", "mean"),
+        )
+        return pd.DataFrame({
+            "date": monthly.index,
+            "location": location,
+            "temperature_C": np.round(monthly["temperature_C"].to_numpy(), 1),
+            "rainfall_mm": np.round(monthly["rainfall_mm"].to_numpy(), 0),
+            "humidity_pct": np.round(monthly["humidity_pct"].to_numpy(), 0)
+        })
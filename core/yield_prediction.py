@@ -3,15 +3,103 @@ import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
+import copy
 import pickle
+import json
 import os
 import logging
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from utils.datasets import registry
+from core.model_registry import ModelRegistry
+from core.forest_inference import FlatForest
+from core.model_store import training_data_hash, make_header, header_problem, save_model, load_model
+
+def _fit_crop_model(X, y, n_jobs=None, random_state=42):
+    """Fit the scaler and forest for one crop. Module-level so it can run in a
+    worker process of the background training pool."""
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    # Train model (using RandomForest for better accuracy)
+    model = RandomForestRegressor(
+        n_estimators=100,
+        max_depth=10,
+        random_state=random_state,
+        n_jobs=n_jobs
+    )
+    model.fit(X_scaled, y)
+    # Parallelism only pays off for training; single-row predictions are
+    # faster without spinning up a worker pool
+    model.set_params(n_jobs=None)
+    return scaler, model
+
+
+class CropModelArtifacts:
+    """Everything the prediction hot path needs besides the model and scaler:
+    feature column order, typical value ranges and category vocabularies.
+    Computed once when a crop's model is trained or loaded and saved next to
+    the model as ``<crop>_model_meta.json``."""
+
+    def __init__(self, crop_type, feature_columns, range_features, q25, q75,
+                 minimum, maximum, categories=None, n_samples=0, mean_yield=None):
+        self.crop_type = crop_type
+        self.feature_columns = list(feature_columns)
+        self.range_features = list(range_features)
+        self.q25 = np.asarray(q25, dtype=np.float64)
+        self.q75 = np.asarray(q75, dtype=np.float64)
+        self.minimum = np.asarray(minimum, dtype=np.float64)
+        self.maximum = np.asarray(maximum, dtype=np.float64)
+        self.categories = categories or {}
+        self.n_samples = n_samples
+        self.mean_yield = mean_yield
+
+    @classmethod
+    def from_training_data(cls, crop_type, crop_data, feature_columns, numeric_features, categorical_features):
+        range_features = [f for f in numeric_features if f in crop_data.columns]
+        values = crop_data[range_features].to_numpy(dtype=np.float64)
+        # Same linear-interpolated quartiles that DataFrame.describe() reports
+        q25, q75 = np.nanpercentile(values, [25, 75], axis=0)
+        categories = {
+            f: sorted(str(c) for c in crop_data[f].dropna().unique())
+            for f in categorical_features if f in crop_data.columns
+        }
+        return cls(
+            crop_type, feature_columns, range_features, q25, q75,
+            np.nanmin(values, axis=0), np.nanmax(values, axis=0), categories,
+            n_samples=len(crop_data),
+            mean_yield=float(crop_data['Crop_Yield_ton'].mean()),
+        )
+
+    def to_dict(self):
+        return {
+            "crop_type": self.crop_type,
+            "feature_columns": self.feature_columns,
+            "range_features": self.range_features,
+            "q25": self.q25.tolist(),
+            "q75": self.q75.tolist(),
+            "minimum": self.minimum.tolist(),
+            "maximum": self.maximum.tolist(),
+            "categories": self.categories,
+            "n_samples": self.n_samples,
+            "mean_yield": self.mean_yield,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        # The meta file also carries the model store header under "store"
+        return cls(**{key: value for key, value in data.items() if key != "store"})
+
 
 class YieldPredictor:
-    def __init__(self, load_pretrained=True):
-        self.farm_data = pd.read_csv("data/farmer_advisor_dataset.csv")
-        self.models = {}
-        self.scalers = {}
+    def __init__(self, load_pretrained=True, models_dir="models", max_models=None,
+                 memory_budget_mb=512, preload=False, background_training=False,
+                 training_workers=None, forest_n_jobs=None, fast_inference=False,
+                 training_retry_seconds=300):
+        self.farm_data = registry.get("farms")
+        registry.on_reload(self._on_dataset_reload)
         self.important_features = [
             'Soil_pH', 'Rainfall_mm', 'Temperature_C', 'Soil_Moisture',
             'Fertilizer_Usage_kg', 'Pesticide_Usage_kg'
@@ -19,14 +107,67 @@ class YieldPredictor:
         self.categorical_features = []
         
         # Setup models directory
-        self.models_dir = "models"
+        self.models_dir = models_dir
         if not os.path.exists(self.models_dir):
             os.makedirs(self.models_dir)
+
+        # Models are loaded (or trained) the first time a crop is requested and
+        # kept in a bounded LRU; load_pretrained=False ignores saved models
+        self.load_pretrained = load_pretrained
+        self.model_registry = ModelRegistry(
+            self._load_crop_model,
+            max_models=max_models,
+            memory_budget_bytes=memory_budget_mb * 1024 * 1024 if memory_budget_mb else None,
+        )
+
+        # With background_training, crops without a saved model are trained in
+        # a process pool while predictions fall back to the crop's mean yield
+        self.background_training = background_training
+        self.training_workers = training_workers
+        self.forest_n_jobs = forest_n_jobs
+        self._executor = None
+        self._training = {}
+        self._training_lock = threading.Lock()
+        # A crop whose background fit failed is not resubmitted until its
+        # retry time (time.monotonic()) has passed
+        self.training_retry_seconds = training_retry_seconds
+        self._training_failures = {}
+
+        # fast_inference compiles each forest into flat arrays (FlatForest)
+        # that predict the same values without sklearn's per-call overhead
+        self.fast_inference = fast_inference
             
-        # Initialize models
-        if load_pretrained:
+        # Optionally warm every crop up front
+        if preload:
             self._load_or_train_models()
-        
+
+    @property
+    def models(self):
+        """Currently loaded models by crop type"""
+        return {crop: entry["model"] for crop, entry in self.model_registry.items()}
+
+    @property
+    def scalers(self):
+        """Currently loaded scalers by crop type"""
+        return {crop: entry["scaler"] for crop, entry in self.model_registry.items()}
+
+    @property
+    def artifacts(self):
+        """Currently loaded training artifacts by crop type"""
+        return {crop: entry["artifacts"] for crop, entry in self.model_registry.items()}
+
+    def model_cache_stats(self):
+        """Hit/miss/eviction counters of the model LRU"""
+        return self.model_registry.stats()
+
+    def _on_dataset_reload(self, name):
+        if name == "farms":
+            self.farm_data = registry.get("farms")
+            self.__dict__.pop('_mean_yields', None)
+            # New data may fix whatever made training fail
+            with self._training_lock:
+                self._training_failures.clear()
+
     def _preprocess_data(self, data, crop_type, for_training=True):
         """Preprocess data for model training or prediction"""
         # Filter data for specific crop if training
@@ -59,58 +200,168 @@ class YieldPredictor:
             return X, feature_cols
             
     def _load_or_train_models(self):
-        """Load pretrained models or train new ones if not available"""
-        crop_types = self.farm_data['Crop_Type'].unique()
-        
-        for crop in crop_types:
-            model_path = os.path.join(self.models_dir, f"{crop}_yield_model.pkl")
-            scaler_path = os.path.join(self.models_dir, f"{crop}_scaler.pkl")
-            
-            if os.path.exists(model_path) and os.path.exists(scaler_path):
-                # Load pretrained model and scaler
-                try:
-                    with open(model_path, 'rb') as f:
-                        self.models[crop] = pickle.load(f)
-                    with open(scaler_path, 'rb') as f:
-                        self.scalers[crop] = pickle.load(f)
-                    logging.info(f"Loaded pretrained model for {crop}")
-                except Exception as e:
-                    logging.error(f"Error loading model for {crop}: {e}")
-                    self._train_model(crop)
-            else:
-                # Train new model
-                self._train_model(crop)
-    
-    def _train_model(self, crop_type):
-        """Train a yield prediction model for a specific crop type"""
+        """Load pretrained models or train new ones for every crop"""
+        for crop in self.farm_data['Crop_Type'].unique():
+            self._get_entry(crop)
+
+    def _get_entry(self, crop_type):
+        """Model, scaler and artifacts for a crop, loading them on first use"""
+        return self.model_registry.get(crop_type)
+
+    def _load_crop_model(self, crop_type):
+        """Registry loader: read a saved model from disk or train a new one"""
+        if self._training_backoff(crop_type):
+            return None
+
+        if self.load_pretrained:
+            entry = self._load_saved_model(crop_type)
+            if entry is not None:
+                return entry
+
+        if self.background_training:
+            # Don't block the caller; the entry is swapped in when ready
+            self.train_async([crop_type])
+            return None
+
+        # Train new model
+        return self._train_model(crop_type)
+
+    def _make_entry(self, model, scaler, artifacts):
+        entry = {"model": model, "scaler": scaler, "artifacts": artifacts}
+        if self.fast_inference:
+            entry["engine"] = FlatForest.from_sklearn(model, scaler)
+        return entry
+
+    def _store_path(self, crop_type):
+        return os.path.join(self.models_dir, f"{crop_type}_yield_model.joblib")
+
+    def _load_saved_model(self, crop_type):
+        """Load a crop's compact model if its header matches the current
+        features and training data, falling back to a legacy pickle"""
+        store_path = self._store_path(crop_type)
+        if not os.path.exists(store_path):
+            return self._load_legacy_model(crop_type)
+
+        # The header is checked before the forest itself is read. Whether the
+        # training data is still current is left to update_models(), so models
+        # refreshed from newly ingested records are not thrown away here.
+        meta = self._read_meta(crop_type)
+        X, _ = self._training_data(crop_type)
+        if X is None:
+            problem = "no training data"
+        else:
+            problem = header_problem(meta.get("store") if meta else None, list(X.columns))
+        if problem:
+            logging.warning(f"Saved model for {crop_type} is stale ({problem}); retraining")
+            return None
+
+        try:
+            model, scaler = load_model(store_path)
+        except Exception as e:
+            logging.error(f"Error loading model for {crop_type}: {e}")
+            return None
+        logging.info(f"Loaded pretrained model for {crop_type}")
+        return self._make_entry(model, scaler, CropModelArtifacts.from_dict(meta))
+
+    def _load_legacy_model(self, crop_type):
+        """Load a model saved as raw pickles and rewrite it in the compact format"""
+        model_path = os.path.join(self.models_dir, f"{crop_type}_yield_model.pkl")
+        scaler_path = os.path.join(self.models_dir, f"{crop_type}_scaler.pkl")
+        if not (os.path.exists(model_path) and os.path.exists(scaler_path)):
+            return None
+
+        try:
+            with open(model_path, 'rb') as f:
+                model = pickle.load(f)
+            with open(scaler_path, 'rb') as f:
+                scaler = pickle.load(f)
+        except Exception as e:
+            logging.error(f"Error loading model for {crop_type}: {e}")
+            return None
+
+        X, y = self._training_data(crop_type)
+        if X is None:
+            return None
+        artifacts = self._load_artifacts(crop_type)
+        # What the legacy forest was trained on is unknown, so the header
+        # carries no data fingerprint and update_models() retrains it in full
+        self._save_model(crop_type, X, y, scaler, model, artifacts, known_data=False)
+        logging.info(f"Migrated legacy pickle model for {crop_type} to {self._store_path(crop_type)}")
+        return self._make_entry(model, scaler, artifacts)
+
+    def _artifacts_path(self, crop_type):
+        return os.path.join(self.models_dir, f"{crop_type}_model_meta.json")
+
+    def _build_artifacts(self, crop_type, feature_columns):
+        crop_data = self.farm_data[self.farm_data['Crop_Type'] == crop_type]
+        numeric_features = [f for f in self.important_features if f not in self.categorical_features]
+        return CropModelArtifacts.from_training_data(
+            crop_type, crop_data, feature_columns, numeric_features, self.categorical_features
+        )
+
+    def _save_artifacts(self, crop_type, artifacts, header=None):
+        meta = artifacts.to_dict()
+        if header is not None:
+            meta["store"] = header
+        path = self._artifacts_path(crop_type)
+        with open(path + ".tmp", 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _read_meta(self, crop_type):
+        try:
+            with open(self._artifacts_path(crop_type)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_artifacts(self, crop_type):
+        """Load a crop's artifacts from disk, deriving them from the data for
+        models saved before artifacts were persisted"""
+        meta = self._read_meta(crop_type)
+        if meta is not None:
+            return CropModelArtifacts.from_dict(meta)
+
+        X, _ = self._preprocess_data(self.farm_data, crop_type)
+        if X is None:
+            return None
+        artifacts = self._build_artifacts(crop_type, list(X.columns))
+        self._save_artifacts(crop_type, artifacts)
+        return artifacts
+
+    def _training_data(self, crop_type):
         X, y = self._preprocess_data(self.farm_data, crop_type)
         
         if X is None or y is None or len(X) < 10:
             logging.warning(f"Not enough data to train model for {crop_type}")
-            return
-            
-        # Scale features
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        self.scalers[crop_type] = scaler
-        
-        # Train model (using RandomForest for better accuracy)
-        model = RandomForestRegressor(
-            n_estimators=100, 
-            max_depth=10,
-            random_state=42
-        )
-        model.fit(X_scaled, y)
-        self.models[crop_type] = model
-        
-        # Save model and scaler
-        model_path = os.path.join(self.models_dir, f"{crop_type}_yield_model.pkl")
-        scaler_path = os.path.join(self.models_dir, f"{crop_type}_scaler.pkl")
-        
-        with open(model_path, 'wb') as f:
-            pickle.dump(model, f)
-        with open(scaler_path, 'wb') as f:
-            pickle.dump(scaler, f)
+            return None, None
+        return X, y
+
+    def _train_model(self, crop_type):
+        """Train a yield prediction model for a specific crop type and return
+        its registry entry, or None if there is not enough data"""
+        X, y = self._training_data(crop_type)
+        if X is None:
+            return None
+        scaler, model = _fit_crop_model(X, y, n_jobs=self.forest_n_jobs)
+        return self._install_model(crop_type, X, y, scaler, model)
+
+    def _save_model(self, crop_type, X, y, scaler, model, artifacts, known_data=True):
+        """Write the compact model file, then the meta file with its header.
+        ``known_data=False`` records no training data fingerprint."""
+        store_path = self._store_path(crop_type)
+        save_model(store_path, model, scaler)
+        # Written last so a half-saved model never has a valid header
+        if known_data:
+            header = make_header(store_path, list(X.columns), training_data_hash(X, y), n_samples=len(X))
+        else:
+            header = make_header(store_path, list(X.columns), None)
+        self._save_artifacts(crop_type, artifacts, header)
+
+    def _install_model(self, crop_type, X, y, scaler, model):
+        """Persist a freshly trained model and return its registry entry"""
+        artifacts = self._build_artifacts(crop_type, list(X.columns))
+        self._save_model(crop_type, X, y, scaler, model, artifacts)
             
         logging.info(f"Trained and saved model for {crop_type}")
         
@@ -121,7 +372,253 @@ class YieldPredictor:
         }).sort_values('Importance', ascending=False)
         
         self.feature_importances = feature_importance
+        return self._make_entry(model, scaler, artifacts)
+
+    def update_models(self, farm_data=None, crop_types=None, extra_trees=20, max_trees=200):
+        """Bring saved models up to date with ``farm_data`` (default: the shared
+        farm dataset) and return what was done for each crop.
+
+        Crops whose training data still matches the stored fingerprint are left
+        alone ("unchanged"). When records were only appended, ``extra_trees``
+        trees fitted on the full data are added to the existing forest
+        ("warm_start"); any other change, or a forest that would grow past
+        ``max_trees``, triggers a full retrain ("retrained").
+        """
+        if farm_data is not None:
+            self.farm_data = farm_data
+            self.__dict__.pop('_mean_yields', None)
+        if crop_types is None:
+            crop_types = [str(crop) for crop in self.farm_data['Crop_Type'].unique()]
+
+        results = {}
+        for crop_type in crop_types:
+            X, y = self._training_data(crop_type)
+            if X is None:
+                results[crop_type] = "skipped"
+                continue
+
+            meta = self._read_meta(crop_type)
+            header = meta.get("store") if meta else None
+            entry = self._load_saved_model(crop_type) if self.load_pretrained else None
+            if entry is not None and header and header.get("training_data_hash") == training_data_hash(X, y):
+                results[crop_type] = "unchanged"
+                continue
+
+            # Append-only if the stored fingerprint matches the leading rows
+            n_old = (header or {}).get("n_samples")
+            appended = (
+                entry is not None and n_old and n_old < len(X)
+                and training_data_hash(X.iloc[:n_old], y.iloc[:n_old]) == header["training_data_hash"]
+            )
+            if appended and len(entry["model"].estimators_) + extra_trees <= max_trees:
+                # Grow a copy so concurrent predictions keep using the old forest
+                scaler, model = entry["scaler"], copy.deepcopy(entry["model"])
+                model.set_params(warm_start=True, n_estimators=len(model.estimators_) + extra_trees)
+                model.fit(scaler.transform(X), y)
+                model.set_params(warm_start=False)
+                results[crop_type] = "warm_start"
+            else:
+                scaler, model = _fit_crop_model(X, y, n_jobs=self.forest_n_jobs)
+                results[crop_type] = "retrained"
+
+            self.model_registry.put(crop_type, self._install_model(crop_type, X, y, scaler, model))
+            logging.info(f"Updated model for {crop_type}: {results[crop_type]}")
+        return results
+
+    def _get_executor(self):
+        with self._training_lock:
+            if self._executor is None:
+                # spawn avoids forking a multi-threaded web server process
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.training_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def train_async(self, crop_types=None):
+        """Train models for the given crops (default: all) in parallel worker
+        processes. Each finished model is saved and swapped into the model
+        registry; returns a dict of futures keyed by crop type."""
+        if crop_types is None:
+            crop_types = [str(crop) for crop in self.farm_data['Crop_Type'].unique()]
+
+        futures = {}
+        for crop_type in crop_types:
+            with self._training_lock:
+                if crop_type in self._training:
+                    futures[crop_type] = self._training[crop_type]
+                    continue
+            X, y = self._training_data(crop_type)
+            if X is None:
+                continue
+
+            future = self._get_executor().submit(_fit_crop_model, X, y, self.forest_n_jobs)
+            with self._training_lock:
+                self._training[crop_type] = future
+            future.add_done_callback(lambda f, crop=crop_type, X=X, y=y: self._on_training_done(crop, X, y, f))
+            futures[crop_type] = future
+            logging.info(f"Scheduled background training for {crop_type}")
+        return futures
+
+    def _on_training_done(self, crop_type, X, y, future):
+        try:
+            scaler, model = future.result()
+            entry = self._install_model(crop_type, X, y, scaler, model)
+            # Atomic swap: readers see either the old entry or the new one
+            self.model_registry.put(crop_type, entry)
+            with self._training_lock:
+                self._training_failures.pop(crop_type, None)
+        except Exception as e:
+            logging.error(f"Background training failed for {crop_type}: {e}; "
+                          f"retrying in {self.training_retry_seconds}s")
+            with self._training_lock:
+                self._training_failures[crop_type] = time.monotonic() + self.training_retry_seconds
+        finally:
+            with self._training_lock:
+                self._training.pop(crop_type, None)
+
+    def train_all(self, crop_types=None, timeout=None):
+        """Train crops in parallel and block until every model is installed"""
+        futures = self.train_async(crop_types)
+        wait(list(futures.values()), timeout=timeout)
+        # Done-callbacks may still be installing the last model
+        for crop_type in futures:
+            while self.is_warming(crop_type):
+                time.sleep(0.01)
+        return {crop: self.model_registry.peek(crop) is not None for crop in futures}
+
+    def _training_backoff(self, crop_type):
+        """True while a failed background fit for ``crop_type`` waits to be retried"""
+        with self._training_lock:
+            retry_at = self._training_failures.get(crop_type)
+            if retry_at is None:
+                return False
+            if time.monotonic() < retry_at:
+                return True
+            del self._training_failures[crop_type]
+            return False
+
+    def is_warming(self, crop_type):
+        """True while a background training job for ``crop_type`` is running"""
+        with self._training_lock:
+            return crop_type in self._training
+
+    def shutdown(self, wait_for_jobs=True):
+        """Stop the background training pool"""
+        with self._training_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait_for_jobs)
+
+    def _mean_yield(self, crop_type):
+        """Dataset mean yield for a crop, served while its model is warming"""
+        if not hasattr(self, '_mean_yields'):
+            self._mean_yields = (
+                self.farm_data.groupby('Crop_Type', observed=True)['Crop_Yield_ton'].mean().to_dict()
+            )
+        return self._mean_yields.get(crop_type)
             
+    # Mapping from form field names to model feature names
+    FIELD_TO_FEATURE = {
+        'farm_id': 'Farm_ID',
+        'field_size': 'Soil_Moisture',  # Use as proxy for field size
+        'soil_ph': 'Soil_pH',
+        'rainfall': 'Rainfall_mm',
+        'temperature': 'Temperature_C',
+        'pesticide_use': 'Pesticide_Usage_kg',
+        'fertilizer_use': 'Fertilizer_Usage_kg',
+        # URL parameter names (from form submission)
+        'Farm_ID': 'Farm_ID',
+        'Field_Size_hectare': 'Soil_Moisture',  # Use as proxy for field size
+        'Soil_pH': 'Soil_pH',
+        'Rainfall_mm': 'Rainfall_mm',
+        'Temperature_C': 'Temperature_C',
+        'Pesticide_Use_kg': 'Pesticide_Usage_kg',
+        'Fertilizer_Use_kg': 'Fertilizer_Usage_kg',
+        # Direct matches
+        'Soil_Moisture': 'Soil_Moisture',
+        'Pesticide_Usage_kg': 'Pesticide_Usage_kg',
+        'Fertilizer_Usage_kg': 'Fertilizer_Usage_kg'
+    }
+
+    def _normalize_key(self, key):
+        """Map a form or URL field name onto the model's feature name"""
+        if key in self.FIELD_TO_FEATURE:
+            return self.FIELD_TO_FEATURE[key]
+        # For any keys not in the mapping, try to match case-insensitive
+        for feature in self.important_features:
+            if key.lower() == feature.lower() or key.replace('_', '') == feature.replace('_', ''):
+                return feature
+        # If no match found, keep the original key
+        return key
+
+    def _normalize_records(self, records):
+        """Build a DataFrame with normalized column names from a DataFrame or list of dicts"""
+        if isinstance(records, pd.DataFrame):
+            frame = records.copy()
+        else:
+            frame = pd.DataFrame(list(records))
+        frame.columns = [self._normalize_key(str(col)) for col in frame.columns]
+        # Later keys win when two input fields map to the same feature, as in a dict update
+        return frame.loc[:, ~frame.columns.duplicated(keep='last')]
+
+    def _encode_features(self, artifacts, frame):
+        """Apply the training-time encoding to ``frame`` and return the model inputs"""
+        frame = frame.copy()
+        for feature in self.categorical_features:
+            if feature in frame.columns:
+                for category in artifacts.categories.get(feature, []):
+                    dummy_name = f"{feature}_{category}"
+                    if dummy_name in artifacts.feature_columns:
+                        frame[dummy_name] = (frame[feature].astype(str) == category).astype(int)
+                frame.drop(feature, axis=1, inplace=True)
+
+        # Missing columns default to 0; keep the training column order
+        return frame.reindex(columns=artifacts.feature_columns).fillna(0)
+
+    def _score_frame(self, crop_type, frame):
+        """Predict base yields and confidence for a normalized frame in one pass.
+
+        Returns ``(base_yields, confidence, outside)`` where ``outside`` maps a
+        feature name to a boolean array of rows beyond its min/max, or None if
+        the crop has no usable model.
+        """
+        entry = self._get_entry(crop_type)
+        if entry is None:
+            return None
+
+        # Column order and typical ranges were captured when the model was trained
+        artifacts = entry["artifacts"]
+        X = self._encode_features(artifacts, frame)
+        if "engine" in entry:
+            base_yields = entry["engine"].predict(X.to_numpy(dtype=np.float64))
+        else:
+            X_scaled = entry["scaler"].transform(X)
+            base_yields = entry["model"].predict(X_scaled)
+
+        # Calculate confidence based on how similar this is to training data
+        # Simple method: higher confidence if field data is within typical ranges
+        in_range_count = np.zeros(len(frame), dtype=np.int64)
+        num_features = np.zeros(len(frame), dtype=np.int64)
+        outside = {}
+
+        for feature in [f for f in self.important_features if f not in self.categorical_features]:
+            if feature not in frame.columns:
+                continue
+            values = frame[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+            present = ~np.isnan(values)
+            num_features += present
+            if feature in artifacts.range_features:
+                i = artifacts.range_features.index(feature)
+                in_range = present & (values >= artifacts.q25[i]) & (values <= artifacts.q75[i])
+                in_range_count += in_range
+                outside[feature] = present & ~in_range & (
+                    (values < artifacts.minimum[i]) | (values > artifacts.maximum[i])
+                )
+
+        confidence = np.minimum(90, np.round(in_range_count / np.maximum(1, num_features) * 100)).astype(int)
+        return base_yields, confidence, outside
+
     def predict_yield(self, crop_type, field_data, weather_impact=1.0):
         """
         Predict yield for a crop based on field data and weather impact
@@ -134,124 +631,34 @@ class YieldPredictor:
         Returns:
         - Dictionary with yield prediction and explanation
         """
-        if crop_type not in self.models:
-            # Train model if not already available
-            self._train_model(crop_type)
-            
-            # If still not available, not enough data
-            if crop_type not in self.models:
-                return {
-                    "yield_prediction": None,
-                    "explanation": f"Insufficient data to make predictions for {crop_type}",
-                    "confidence": 0
-                }
-        
-        # Create a mapping from form field names to model feature names
-        field_to_feature_mapping = {
-            'farm_id': 'Farm_ID',
-            'field_size': 'Soil_Moisture',  # Use as proxy for field size
-            'soil_ph': 'Soil_pH',
-            'rainfall': 'Rainfall_mm',
-            'temperature': 'Temperature_C',
-            'pesticide_use': 'Pesticide_Usage_kg',
-            'fertilizer_use': 'Fertilizer_Usage_kg',
-            # URL parameter names (from form submission)
-            'Farm_ID': 'Farm_ID',
-            'Field_Size_hectare': 'Soil_Moisture',  # Use as proxy for field size
-            'Soil_pH': 'Soil_pH', 
-            'Rainfall_mm': 'Rainfall_mm',
-            'Temperature_C': 'Temperature_C',
-            'Pesticide_Use_kg': 'Pesticide_Usage_kg',
-            'Fertilizer_Use_kg': 'Fertilizer_Usage_kg',
-            # Direct matches
-            'Soil_Moisture': 'Soil_Moisture',
-            'Pesticide_Usage_kg': 'Pesticide_Usage_kg',
-            'Fertilizer_Usage_kg': 'Fertilizer_Usage_kg'
-        }
-        
-        # Normalize field data to match expected feature names
-        normalized_data = {}
-        for key, value in field_data.items():
-            if key in field_to_feature_mapping:
-                normalized_data[field_to_feature_mapping[key]] = value
-            else:
-                # For any keys not in the mapping, try to match case-insensitive
-                for feature in self.important_features:
-                    if key.lower() == feature.lower() or key.replace('_', '') == feature.replace('_', ''):
-                        normalized_data[feature] = value
-                        break
-                else:
-                    # If no match found, keep the original key
-                    normalized_data[key] = value
-        
-        logging.info(f"Normalized data for prediction: {normalized_data}")
-                
-        # Convert field data to DataFrame
-        field_df = pd.DataFrame([normalized_data])
-        
-        # Get the training features for this crop type
-        # We need to recreate the same preprocessing pipeline used for training
-        X_train, _ = self._preprocess_data(self.farm_data[self.farm_data['Crop_Type'] == crop_type], crop_type, for_training=True)
-        if X_train is None:
+        frame = self._normalize_records([field_data])
+        logging.info(f"Normalized data for prediction: {frame.iloc[0].to_dict()}")
+
+        scored = self._score_frame(crop_type, frame)
+        if scored is None and self.is_warming(crop_type):
+            mean_yield = self._mean_yield(crop_type)
+            return {
+                "yield_prediction": round(mean_yield * weather_impact, 2),
+                "base_yield": round(mean_yield, 2),
+                "weather_impact": round(weather_impact, 2),
+                "unit": "tons/hectare",
+                "explanation": f"The {crop_type} model is still warming up; showing the average {crop_type} yield adjusted for weather.",
+                "confidence": 0,
+                "model_warming": True
+            }
+        if scored is None:
             return {
                 "yield_prediction": None,
-                "explanation": f"Insufficient training data for {crop_type}",
+                "explanation": f"Insufficient data to make predictions for {crop_type}",
                 "confidence": 0
             }
-        
-        # Process the input data using the same transformation
-        # First, handle categorical features
-        for feature in self.categorical_features:
-            if feature in field_df.columns:
-                # Get unique values from training data for this categorical feature
-                train_categories = self.farm_data[self.farm_data['Crop_Type'] == crop_type][feature].unique()
-                
-                # One-hot encode the categorical feature
-                for category in train_categories:
-                    dummy_name = f"{feature}_{category}"
-                    if dummy_name in X_train.columns:
-                        field_df[dummy_name] = 1 if field_df[feature].iloc[0] == category else 0
-                
-                # Drop the original categorical column
-                field_df.drop(feature, axis=1, inplace=True)
-        
-        # Ensure all columns from training exist in prediction data (with same order)
-        for col in X_train.columns:
-            if col not in field_df.columns:
-                field_df[col] = 0  # Default value for missing columns
-        
-        # Select only the columns that were used during training, in the same order
-        X = field_df[X_train.columns]
-        
-        # Scale the features
-        X_scaled = self.scalers[crop_type].transform(X)
-        
-        # Make prediction
-        base_yield = self.models[crop_type].predict(X_scaled)[0]
-        
+        base_yields, confidence, outside = scored
+        base_yield = base_yields[0]
+
         # Apply weather impact factor
         adjusted_yield = base_yield * weather_impact
-        
-        # Calculate confidence based on how similar this is to training data
-        # Simple method: higher confidence if field data is within typical ranges
-        typical_ranges = self.farm_data[self.farm_data['Crop_Type'] == crop_type].describe()
-        in_range_count = 0
-        feature_comments = []
-        
-        for feature in [f for f in self.important_features if f not in self.categorical_features]:
-            if feature in normalized_data and feature in typical_ranges.columns:
-                value = normalized_data[feature]
-                low = typical_ranges[feature]['25%']
-                high = typical_ranges[feature]['75%']
-                
-                if low <= value <= high:
-                    in_range_count += 1
-                elif value < typical_ranges[feature]['min'] or value > typical_ranges[feature]['max']:
-                    feature_comments.append(f"{feature} is outside typical range")
-        
-        num_features = len([f for f in self.important_features if f not in self.categorical_features and f in normalized_data])
-        confidence_pct = min(90, round((in_range_count / max(1, num_features)) * 100))
-        
+        feature_comments = [f"{feature} is outside typical range" for feature, flags in outside.items() if flags[0]]
+
         # Generate explanation
         if weather_impact < 0.9:
             weather_effect = "reduced due to unfavorable weather conditions"
@@ -272,12 +679,52 @@ class YieldPredictor:
             "weather_impact": round(weather_impact, 2),
             "unit": "tons/hectare",
             "explanation": explanation,
-            "confidence": confidence_pct
+            "confidence": int(confidence[0])
         }
-        
+
+    def predict_yield_batch(self, crop_type, records, weather_impact=1.0):
+        """
+        Predict yields for many fields of one crop with a single model call
+
+        Parameters:
+        - crop_type: Type of crop to predict yield for
+        - records: DataFrame or list of dicts with field characteristics
+        - weather_impact: Scalar or per-record array of weather impact factors
+
+        Returns:
+        - DataFrame with yield_prediction, base_yield, weather_impact and
+          confidence columns, aligned with the input records
+        """
+        frame = self._normalize_records(records)
+        index = records.index if isinstance(records, pd.DataFrame) else pd.RangeIndex(len(frame))
+        impact = np.broadcast_to(np.asarray(weather_impact, dtype=np.float64), (len(frame),))
+
+        scored = self._score_frame(crop_type, frame) if len(frame) else None
+        if scored is None:
+            # While the model warms up, every record gets the crop's mean yield
+            warming = self.is_warming(crop_type)
+            mean_yield = self._mean_yield(crop_type) if warming else np.nan
+            return pd.DataFrame({
+                "yield_prediction": np.round(mean_yield * impact, 2),
+                "base_yield": np.round(mean_yield, 2),
+                "weather_impact": np.round(impact, 2),
+                "confidence": 0,
+                "model_warming": warming
+            }, index=index)
+
+        base_yields, confidence, _ = scored
+        return pd.DataFrame({
+            "yield_prediction": np.round(base_yields * impact, 2),
+            "base_yield": np.round(base_yields, 2),
+            "weather_impact": np.round(impact, 2),
+            "confidence": confidence,
+            "model_warming": False
+        }, index=index)
+
     def get_feature_importance(self, crop_type):
         """Get the importance of different features for yield prediction"""
-        if crop_type not in self.models:
+        entry = self._get_entry(crop_type)
+        if entry is None:
             return None
             
         # Use the cached feature importances if available
@@ -285,14 +732,9 @@ class YieldPredictor:
             return self.feature_importances
             
         # Otherwise, calculate them
-        X, _ = self._preprocess_data(self.farm_data, crop_type)
-        
-        if X is None:
-            return None
-            
         importance = pd.DataFrame({
-            'Feature': X.columns,
-            'Importance': self.models[crop_type].feature_importances_
+            'Feature': entry["artifacts"].feature_columns,
+            'Importance': entry["model"].feature_importances_
         }).sort_values('Importance', ascending=False)
         
         return importance
@@ -308,7 +750,7 @@ class YieldPredictor:
         Returns:
         - Dictionary with recommendations for management practices
         """
-        if crop_type not in self.models:
+        if self._get_entry(crop_type) is None:
             return None
         
         # Normalize field data - ensure keys match the expected feature names
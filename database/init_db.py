@@ -1,63 +1,307 @@
 import sqlite3
 import pandas as pd
+import argparse
 import os
+import sys
 
 # Paths
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, "database", "agro_system.db")
 FARM_DATA_PATH = os.path.join(BASE_DIR, "data", "farmer_advisor_dataset.csv")
 MARKET_DATA_PATH = os.path.join(BASE_DIR, "data", "market_researcher_dataset.csv")
+MODELS_DIR = os.path.join(BASE_DIR, "models")
 
-# Connect to SQLite DB
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
-
-# Drop existing tables (to avoid schema mismatch)
-cursor.execute("DROP TABLE IF EXISTS farms")
-cursor.execute("DROP TABLE IF EXISTS markets")
-
-# Create farms table
-cursor.execute('''
-CREATE TABLE farms (
-    Farm_ID INTEGER,
-    Soil_pH REAL,
-    Soil_Moisture REAL,
-    Temperature_C REAL,
-    Rainfall_mm REAL,
-    Crop_Type TEXT,
-    Fertilizer_Usage_kg REAL,
-    Pesticide_Usage_kg REAL,
-    Crop_Yield_ton REAL,
-    Sustainability_Score REAL
-)
-''')
-
-# Create markets table
-cursor.execute('''
-CREATE TABLE markets (
-    Market_ID INTEGER,
-    Product TEXT,
-    Market_Price_per_ton REAL,
-    Demand_Index REAL,
-    Supply_Index REAL,
-    Competitor_Price_per_ton REAL,
-    Economic_Indicator REAL,
-    Weather_Impact_Score REAL,
-    Seasonal_Factor REAL,
-    Consumer_Trend_Index REAL
-)
-''')
-
-# Load CSV data
-df_farms = pd.read_csv(FARM_DATA_PATH)
-df_markets = pd.read_csv(MARKET_DATA_PATH)
-
-# Insert data into tables
-df_farms.to_sql("farms", conn, if_exists="append", index=False)
-df_markets.to_sql("markets", conn, if_exists="append", index=False)
-
-# Finalize and close connection
-conn.commit()
-conn.close()
-
-print("✅ Database initialized and datasets imported successfully.")
+# Allow `python database/init_db.py` to import the project's utils package
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+# Table definitions: primary key column and ordered (column, type) pairs
+TABLES = {
+    "farms": {
+        "key": "Farm_ID",
+        "columns": [
+            ("Farm_ID", "INTEGER"),
+            ("Soil_pH", "REAL"),
+            ("Soil_Moisture", "REAL"),
+            ("Temperature_C", "REAL"),
+            ("Rainfall_mm", "REAL"),
+            ("Crop_Type", "TEXT"),
+            ("Fertilizer_Usage_kg", "REAL"),
+            ("Pesticide_Usage_kg", "REAL"),
+            ("Crop_Yield_ton", "REAL"),
+            ("Sustainability_Score", "REAL"),
+        ],
+    },
+    "markets": {
+        "key": "Market_ID",
+        "columns": [
+            ("Market_ID", "INTEGER"),
+            ("Product", "TEXT"),
+            ("Market_Price_per_ton", "REAL"),
+            ("Demand_Index", "REAL"),
+            ("Supply_Index", "REAL"),
+            ("Competitor_Price_per_ton", "REAL"),
+            ("Economic_Indicator", "REAL"),
+            ("Weather_Impact_Score", "REAL"),
+            ("Seasonal_Factor", "TEXT"),
+            ("Consumer_Trend_Index", "REAL"),
+        ],
+    },
+}
+
+# Indexes backing the lookups in utils/db_utils.py. Farm_ID and Market_ID are
+# INTEGER PRIMARY KEYs (rowid aliases) so they need no separate index.
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_farms_crop_ph ON farms (Crop_Type, Soil_pH)",
+    "CREATE INDEX IF NOT EXISTS idx_farms_ph_yield ON farms (Soil_pH, Crop_Type, Crop_Yield_ton)",
+    "CREATE INDEX IF NOT EXISTS idx_markets_product ON markets "
+    "(Product, Market_Price_per_ton, Demand_Index, Supply_Index)",
+]
+
+
+# Materialized aggregates served by utils/db_utils.py. Each entry maps the
+# summary table to its source table, group key and the SELECT producing rows.
+SUMMARIES = {
+    "market_summary": {
+        "source": "markets",
+        "group": "Product",
+        "ddl": """
+        CREATE TABLE IF NOT EXISTS market_summary (
+            Product TEXT PRIMARY KEY,
+            Row_Count INTEGER,
+            Avg_Price REAL,
+            Avg_Demand REAL,
+            Avg_Supply REAL,
+            Avg_Profitability REAL
+        )
+        """,
+        "select": """
+        SELECT Product, COUNT(*), AVG(Market_Price_per_ton), AVG(Demand_Index),
+               AVG(Supply_Index),
+               AVG(Market_Price_per_ton * Demand_Index / MAX(Supply_Index, 0.1))
+        FROM markets
+        """,
+    },
+    "crop_summary": {
+        "source": "farms",
+        "group": "Crop_Type",
+        "ddl": """
+        CREATE TABLE IF NOT EXISTS crop_summary (
+            Crop_Type TEXT PRIMARY KEY,
+            Row_Count INTEGER,
+            Avg_Yield REAL,
+            Min_Yield REAL,
+            Max_Yield REAL,
+            Avg_Sustainability REAL
+        )
+        """,
+        "select": """
+        SELECT Crop_Type, COUNT(*), AVG(Crop_Yield_ton), MIN(Crop_Yield_ton),
+               MAX(Crop_Yield_ton), AVG(Sustainability_Score)
+        FROM farms
+        """,
+    },
+}
+
+
+def _create_table_sql(table):
+    spec = TABLES[table]
+    cols = ",\n    ".join(
+        f"{name} {col_type}{' PRIMARY KEY' if name == spec['key'] else ''}"
+        for name, col_type in spec["columns"]
+    )
+    return f"CREATE TABLE IF NOT EXISTS {table} (\n    {cols}\n)"
+
+
+def _has_primary_key(conn, table):
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    return any(row[5] for row in info)
+
+
+def create_schema(conn):
+    """Create tables and indexes, migrating legacy key-less tables in place"""
+    for table in TABLES:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        if exists and not _has_primary_key(conn, table):
+            # Databases built by older versions of this script have no keys;
+            # copy their rows into the keyed schema so upserts can work.
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+            conn.execute(_create_table_sql(table))
+            conn.execute(f"INSERT OR REPLACE INTO {table} SELECT * FROM {table}_legacy")
+            conn.execute(f"DROP TABLE {table}_legacy")
+        else:
+            conn.execute(_create_table_sql(table))
+    for statement in INDEXES:
+        conn.execute(statement)
+    for spec in SUMMARIES.values():
+        conn.execute(spec["ddl"])
+
+
+def refresh_summaries(conn, keys=None):
+    """Recompute summary rows, either fully or only for the changed groups.
+
+    ``keys`` maps a source table to the group values touched by an ingest,
+    e.g. ``{"markets": {"Rice"}}``. Tables absent from ``keys`` are left as is.
+    """
+    for name, spec in SUMMARIES.items():
+        group = spec["group"]
+        # A summary table created during this ingest starts empty and needs a
+        # full build before it can be maintained incrementally.
+        empty = conn.execute(f"SELECT NOT EXISTS (SELECT 1 FROM {name})").fetchone()[0]
+        if keys is None or empty:
+            conn.execute(f"DELETE FROM {name}")
+            conn.execute(f"INSERT INTO {name} {spec['select']} GROUP BY {group}")
+            continue
+
+        changed = sorted(keys.get(spec["source"], ()))
+        if not changed:
+            continue
+        placeholders = ", ".join("?" for _ in changed)
+        conn.execute(f"DELETE FROM {name} WHERE {group} IN ({placeholders})", changed)
+        conn.execute(
+            f"INSERT INTO {name} {spec['select']} WHERE {group} IN ({placeholders}) GROUP BY {group}",
+            changed,
+        )
+
+
+def _touched_groups(conn, table, df):
+    """Group values a batch will affect: its own plus those of rows it overwrites"""
+    spec = TABLES[table]
+    group = next(s["group"] for s in SUMMARIES.values() if s["source"] == table)
+    groups = set(df[group].dropna().astype(str))
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_keys (key INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM batch_keys")
+    conn.executemany(
+        "INSERT OR IGNORE INTO batch_keys VALUES (?)",
+        ((int(k),) for k in df[spec["key"]].dropna()),
+    )
+    existing = conn.execute(
+        f"SELECT DISTINCT {group} FROM {table} WHERE {spec['key']} IN (SELECT key FROM batch_keys)"
+    ).fetchall()
+    groups.update(row[0] for row in existing)
+    return groups
+
+
+def _rows(df, table):
+    columns = [name for name, _ in TABLES[table]["columns"]]
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"{table} data is missing columns: {', '.join(missing)}")
+    # object dtype converts NumPy scalars to Python types sqlite3 can bind
+    frame = df[columns].astype(object).where(df[columns].notna(), None)
+    return columns, frame.to_numpy().tolist()
+
+
+def upsert_dataframe(conn, table, df):
+    """Insert or update rows of ``df`` by primary key; returns the row count"""
+    columns, rows = _rows(df, table)
+    key = TABLES[table]["key"]
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != key)
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)}) "
+        f"ON CONFLICT({key}) DO UPDATE SET {updates}"
+    )
+    conn.executemany(sql, rows)
+    return len(rows)
+
+
+def rebuild(db_path=DB_PATH, farm_path=FARM_DATA_PATH, market_path=MARKET_DATA_PATH):
+    """Drop and reload both tables from the source CSVs in one transaction"""
+    df_farms = pd.read_csv(farm_path)
+    df_markets = pd.read_csv(market_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            for table in TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            create_schema(conn)
+            upsert_dataframe(conn, "farms", df_farms)
+            upsert_dataframe(conn, "markets", df_markets)
+            refresh_summaries(conn)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return {"farms": len(df_farms), "markets": len(df_markets)}
+
+
+def ingest(farm_path=None, market_path=None, db_path=DB_PATH, models_dir=None):
+    """Append or update CSV batches without dropping existing data. With
+    ``models_dir``, yield models there are updated if farm records changed."""
+    batches = {}
+    if farm_path:
+        batches["farms"] = pd.read_csv(farm_path)
+    if market_path:
+        batches["markets"] = pd.read_csv(market_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            create_schema(conn)
+            touched = {table: _touched_groups(conn, table, df) for table, df in batches.items()}
+            counts = {table: upsert_dataframe(conn, table, df) for table, df in batches.items()}
+            refresh_summaries(conn, touched)
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    if models_dir and "farms" in batches:
+        update_yield_models(db_path, models_dir)
+    return counts
+
+
+def update_yield_models(db_path=DB_PATH, models_dir=MODELS_DIR):
+    """Warm-start or retrain the yield models of crops whose farm records
+    changed, using every farm row now in the database"""
+    from core.yield_prediction import YieldPredictor
+
+    conn = sqlite3.connect(db_path)
+    try:
+        # Farm_ID order keeps earlier rows first so appends can be detected
+        farms = pd.read_sql_query("SELECT * FROM farms ORDER BY Farm_ID", conn)
+    finally:
+        conn.close()
+
+    predictor = YieldPredictor(models_dir=models_dir)
+    return predictor.update_models(farms)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or update the agro_system database")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    parser.add_argument("--farms", help="farm CSV batch to upsert incrementally")
+    parser.add_argument("--markets", help="market CSV batch to upsert incrementally")
+    parser.add_argument("--no-snapshots", action="store_true",
+                        help="skip writing the memory-mapped dataset snapshots")
+    parser.add_argument("--update-models", action="store_true",
+                        help="warm-start or retrain yield models whose farm data changed")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="yield model directory")
+    args = parser.parse_args(argv)
+
+    if args.farms or args.markets:
+        counts = ingest(args.farms, args.markets, db_path=args.db,
+                        models_dir=args.models_dir if args.update_models else None)
+        print(f"✅ Upserted {counts} rows into {args.db}.")
+    else:
+        rebuild(args.db)
+        print("✅ Database initialized and datasets imported successfully.")
+        if args.update_models:
+            update_yield_models(args.db, args.models_dir)
+
+    if args.update_models:
+        print(f"✅ Yield models in {args.models_dir} are up to date.")
+
+    if not args.no_snapshots:
+        from utils.datasets import build_snapshots
+        build_snapshots()
+        print("✅ Columnar dataset snapshots written to data/snapshots.")
+
+
+if __name__ == "__main__":
+    main()
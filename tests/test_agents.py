@@ -73,3 +73,34 @@ def test_inter_agent_message_passing():
     assert isinstance(response, dict)
     assert "response" in response
     assert isinstance(response["response"], str)
+
+def test_neighbour_index_matches_window_scan():
+    advisor = FarmerAdvisor(name="FarmerAdvisor")
+    data = advisor.farm_data
+
+    for _, farm in data.sample(20, random_state=0).iterrows():
+        ph, rain, temp = farm["Soil_pH"], farm["Rainfall_mm"], farm["Temperature_C"]
+        expected = data.index[
+            data["Soil_pH"].between(ph - 0.5, ph + 0.5)
+            & data["Rainfall_mm"].between(rain - 100, rain + 100)
+            & data["Temperature_C"].between(temp - 2, temp + 2)
+        ].to_numpy()
+
+        assert (advisor.neighbour_index.box_query((ph, rain, temp)) == expected).all()
+
+def test_knn_fallback_for_sparse_regions():
+    advisor = FarmerAdvisor(name="FarmerAdvisor", knn_fallback=5)
+
+    assert len(advisor.neighbour_index.box_query((6.5, 5000, 60))) == 0
+    assert len(advisor.neighbour_index.nearest((6.5, 5000, 60), 5)) == 5
+
+def test_recommend_many_matches_single_requests():
+    advisor = FarmerAdvisor(name="FarmerAdvisor")
+    farm_ids = [1, 42, 999999, 17]
+
+    batch = advisor.recommend_many(farm_ids)
+    single = [advisor.run({"query": "recommend crops", "farm_id": farm_id}) for farm_id in farm_ids]
+
+    assert batch == single
+    assert batch[2]["type"] == "error"
+    assert batch[0]["type"] == "recommendation"
@@ -0,0 +1,34 @@
+import gzip
+import json
+
+from utils.chart_cache import ChartCache
+
+
+def test_payloads_are_built_once_per_version_and_precompressed():
+    cache = ChartCache(max_entries=2)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return json.dumps({"data": [{"y": list(range(500))}]})
+
+    first = cache.get_or_build("price_trends", ("Rice", "Wheat"), 1, build)
+    again = cache.get_or_build("price_trends", ("Rice", "Wheat"), 1, build)
+    assert again is first and len(builds) == 1
+    assert gzip.decompress(first.gzipped) == first.body
+
+    newer = cache.get_or_build("price_trends", ("Rice", "Wheat"), 2, build)
+    assert len(builds) == 2
+    # Same content under a new data version keeps the same ETag
+    assert newer.etag == first.etag
+
+
+def test_small_payloads_skip_gzip_and_lru_evicts():
+    cache = ChartCache(max_entries=2)
+    small = cache.get_or_build("weather", "Warangal", 1, lambda: "{}")
+    assert small.gzipped is None and small.body == b"{}"
+
+    cache.get_or_build("weather", "Pune", 1, lambda: "{}")
+    cache.get_or_build("weather", "Nagpur", 1, lambda: "{}")
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["misses"] == 3
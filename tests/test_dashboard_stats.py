@@ -0,0 +1,45 @@
+import pandas as pd
+
+from core.dashboard_stats import DashboardStats
+from utils.datasets import DATASETS, DatasetRegistry
+
+
+def _registry(tmp_path, farm_rows=200):
+    farms = tmp_path / "farms.csv"
+    pd.read_csv(DATASETS["farms"]["path"], nrows=farm_rows).to_csv(farms, index=False)
+    markets = tmp_path / "markets.csv"
+    pd.read_csv(DATASETS["markets"]["path"], nrows=100).to_csv(markets, index=False)
+    return DatasetRegistry({
+        "farms": {"path": str(farms), "dtype": DATASETS["farms"]["dtype"]},
+        "markets": {"path": str(markets), "dtype": DATASETS["markets"]["dtype"]},
+    })
+
+
+def _expected(farm_data, market_data):
+    return {
+        "total_farms": farm_data["Farm_ID"].nunique(),
+        "avg_yield": round(farm_data["Crop_Yield_ton"].mean(), 2),
+        "avg_sustainability": round(farm_data["Sustainability_Score"].mean(), 2),
+        "top_crops": farm_data.groupby("Crop_Type", observed=True)["Crop_Yield_ton"].mean()
+        .sort_values(ascending=False).head(5).rename(index=str).to_dict(),
+        "recent_prices": market_data.sort_values("Market_ID").drop_duplicates(subset=["Product"]).head(5)
+        .astype({"Product": str}).set_index("Product")["Market_Price_per_ton"].to_dict(),
+    }
+
+
+def test_stats_match_direct_computation_and_follow_reloads(tmp_path):
+    reg = _registry(tmp_path)
+    stats = DashboardStats(registry=reg)
+
+    first = stats.get()
+    assert {k: first[k] for k in _expected(reg.get("farms"), reg.get("markets"))} == \
+        _expected(reg.get("farms"), reg.get("markets"))
+    assert stats.get()["versions"] == first["versions"]
+
+    pd.read_csv(DATASETS["farms"]["path"], nrows=50).to_csv(tmp_path / "farms.csv", index=False)
+    reg.reload("farms")
+    second = stats.get()
+
+    assert second["total_farms"] == 50
+    assert second["versions"] == {"farms": 2, "markets": 1}
+
@@ -0,0 +1,46 @@
+import pytest
+
+from utils.datasets import DATASETS, DatasetRegistry
+
+
+def test_views_share_one_load_and_are_read_only():
+    reg = DatasetRegistry(DATASETS)
+    first = reg.get("farms")
+    second = reg.get("farms")
+
+    assert reg.version("farms") == 1
+    assert str(first["Crop_Type"].dtype) == "category"
+    with pytest.raises(ValueError):
+        first.loc[0, "Soil_pH"] = 0.0
+
+    first["Extra"] = 1
+    assert "Extra" not in second.columns
+
+
+def test_reload_bumps_version_and_notifies():
+    reg = DatasetRegistry(DATASETS)
+    reg.get("markets")
+    seen = []
+    reg.on_reload(seen.append)
+
+    reg.reload("markets")
+
+    assert reg.version("markets") == 2
+    assert seen == ["markets"]
+
+
+def test_snapshot_round_trip_and_staleness(tmp_path):
+    import pandas as pd
+    from utils.snapshots import build_snapshot, load_snapshot
+
+    source = tmp_path / "farms.csv"
+    pd.read_csv(DATASETS["farms"]["path"], nrows=50).to_csv(source, index=False)
+    df = pd.read_csv(source, dtype=DATASETS["farms"]["dtype"])
+    snapshot_dir = str(tmp_path / "snapshot")
+
+    build_snapshot(df, str(source), snapshot_dir)
+    pd.testing.assert_frame_equal(load_snapshot(str(source), snapshot_dir), df)
+
+    with open(source, "a") as f:
+        f.write("9999,6.5,20,25,150,Rice,100,2,5,50\n")
+    assert load_snapshot(str(source), snapshot_dir) is None
@@ -0,0 +1,68 @@
+import sqlite3
+import threading
+
+from utils.db_utils import ConnectionPool, get_market_trends, get_pool_stats
+
+
+def _make_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(10)])
+    conn.commit()
+    conn.close()
+
+
+def test_pool_reuses_connections(tmp_path):
+    db_path = str(tmp_path / "pool.db")
+    _make_db(db_path)
+    pool = ConnectionPool(db_path, max_size=2)
+
+    for _ in range(5):
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 10
+
+    stats = pool.stats()
+    assert stats["created"] == 1
+    assert stats["acquired"] == 5
+    assert stats["in_use"] == 0
+
+
+def test_pool_is_bounded_across_threads(tmp_path):
+    db_path = str(tmp_path / "pool.db")
+    _make_db(db_path)
+    pool = ConnectionPool(db_path, max_size=2)
+
+    def worker():
+        for _ in range(20):
+            with pool.connection() as conn:
+                conn.execute("SELECT SUM(x) FROM t").fetchone()
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = pool.stats()
+    assert stats["created"] <= 2
+    assert stats["acquired"] == 120
+
+
+def test_read_only_pool_rejects_writes(tmp_path):
+    db_path = str(tmp_path / "pool.db")
+    _make_db(db_path)
+    pool = ConnectionPool(db_path, read_only=True)
+
+    with pool.connection() as conn:
+        try:
+            conn.execute("INSERT INTO t VALUES (99)")
+        except sqlite3.OperationalError:
+            pass
+        else:
+            raise AssertionError("read-only connection accepted a write")
+
+
+def test_query_helpers_use_shared_pool():
+    trends = get_market_trends()
+    assert not trends.empty
+    assert any(key.endswith("(ro)") for key in get_pool_stats())
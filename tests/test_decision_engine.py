@@ -12,3 +12,19 @@ def test_sustainability_score():
     assert isinstance(result, dict)
     assert "recommendation" in result
     assert isinstance(result["recommendation"], list)
+
+def test_ph_index_matches_full_scan():
+    from core.sustainability import calculate_sustainability_scores
+
+    engine = DecisionEngine([])
+    data = engine.data
+    scores = calculate_sustainability_scores(data)
+
+    for target_ph in (5.2, 5.75, 6.2, 7.1, 7.9):
+        mask = (data["Soil_pH"] >= target_ph - 0.5) & (data["Soil_pH"] <= target_ph + 0.5)
+        expected = sorted(scores[mask.to_numpy()], reverse=True)[:3]
+
+        result = engine.run({"query": f"Recommend crops for pH {target_ph}"})
+        assert [r["Sustainability_Score"] for r in result["recommendation"]] == expected
+
+    assert engine.run({"query": "pH 20"}) == {"response": "No valid recommendations found."}
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.downsampling import aggregate_series, downsample, lttb_indices, minmax_indices
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    y[437] = 25.0
+
+    keep = lttb_indices(x, y, 100)
+
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+    assert 437 in keep
+    assert np.array_equal(lttb_indices(x[:50], y[:50], 100), np.arange(50))
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    y = np.random.default_rng(0).normal(size=1000)
+    keep = minmax_indices(y, 50)
+
+    assert len(keep) <= 50
+    assert y.argmin() in keep and y.argmax() in keep
+
+
+def test_downsample_and_aggregate_per_group():
+    dates = pd.date_range("2023-01-01", periods=700, freq="D")
+    df = pd.DataFrame({
+        "Product": np.repeat(["Wheat", "Rice"], 350),
+        "date": np.concatenate([dates[::2], dates[1::2]]),
+        "price": np.arange(700, dtype=float),
+    })
+
+    reduced = downsample(df, "date", "price", 40, group="Product", method="minmax")
+    assert list(reduced["Product"].unique()) == ["Wheat", "Rice"]
+    assert reduced.groupby("Product").size().max() <= 40
+    assert reduced.groupby("Product")["date"].apply(lambda s: s.is_monotonic_increasing).all()
+
+    weekly = aggregate_series(df, "date", "price", "weekly", group="Product")
+    first_week = df[(df["Product"] == "Wheat") & (df["date"] < "2023-01-02")]["price"].mean()
+    assert weekly.iloc[0]["price"] == first_week
+    assert len(weekly) <= 2 * (700 // 7 + 2)
+
+    with pytest.raises(ValueError):
+        downsample(df, "date", "price", 40, method="mean")
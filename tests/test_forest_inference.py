@@ -0,0 +1,31 @@
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from core.forest_inference import FlatForest
+from core.yield_prediction import YieldPredictor
+from tests.test_yield_prediction import _records
+
+
+def test_flat_forest_matches_sklearn():
+    rng = np.random.default_rng(7)
+    X = rng.normal(loc=[6.5, 150, 25], scale=[0.5, 50, 4], size=(400, 3))
+    y = X @ [1.0, 0.01, -0.2] + rng.normal(size=400)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0).fit(scaler.transform(X), y)
+
+    engine = FlatForest.from_sklearn(model, scaler)
+    queries = rng.normal(loc=[6.5, 150, 25], scale=[1, 100, 8], size=(300, 3))
+
+    assert np.array_equal(engine.predict(queries), model.predict(scaler.transform(queries)))
+    assert np.array_equal(engine.predict(queries[0]), model.predict(scaler.transform(queries[:1])))
+
+
+def test_fast_inference_predictions_match(tmp_path):
+    slow = YieldPredictor(load_pretrained=False, models_dir=str(tmp_path))
+    records = _records()
+    expected = slow.predict_yield_batch("Rice", records)
+
+    fast = YieldPredictor(models_dir=str(tmp_path), fast_inference=True)
+    assert fast.predict_yield_batch("Rice", records).equals(expected)
+    assert fast.predict_yield("Rice", records[0]) == slow.predict_yield("Rice", records[0])
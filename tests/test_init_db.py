@@ -0,0 +1,90 @@
+import sqlite3
+
+import pandas as pd
+
+from database import init_db
+from utils.db_utils import ConnectionPool
+
+
+def _build(tmp_path):
+    db_path = str(tmp_path / "agro.db")
+    init_db.rebuild(db_path)
+    return db_path
+
+
+def test_rebuild_creates_keys_and_indexes(tmp_path):
+    db_path = _build(tmp_path)
+    conn = sqlite3.connect(db_path)
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM markets WHERE Product = ?", ("Rice",)
+    ).fetchall()
+    conn.close()
+
+    assert {"idx_farms_crop_ph", "idx_markets_product"} <= indexes
+    assert any("idx_markets_product" in row[-1] for row in plan)
+
+
+def test_ingest_upserts_without_reload(tmp_path):
+    db_path = _build(tmp_path)
+    batch = pd.read_csv(init_db.FARM_DATA_PATH).head(2)
+    batch.loc[0, "Crop_Yield_ton"] = 42.0
+    batch.loc[1, "Farm_ID"] = 999999
+    batch_path = tmp_path / "farms_batch.csv"
+    batch.to_csv(batch_path, index=False)
+
+    counts = init_db.ingest(farm_path=str(batch_path), db_path=db_path)
+
+    conn = sqlite3.connect(db_path)
+    total = conn.execute("SELECT COUNT(*) FROM farms").fetchone()[0]
+    updated = conn.execute(
+        "SELECT Crop_Yield_ton FROM farms WHERE Farm_ID = ?", (int(batch.loc[0, "Farm_ID"]),)
+    ).fetchone()[0]
+    conn.close()
+
+    assert counts == {"farms": 2}
+    assert total == 10001
+    assert updated == 42.0
+
+
+def test_read_only_pool_opens_wal_database(tmp_path):
+    db_path = _build(tmp_path)
+    pool = ConnectionPool(db_path, read_only=True)
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM farms").fetchone()[0] == 10000
+
+
+def test_summaries_match_base_tables(tmp_path):
+    db_path = _build(tmp_path)
+    conn = sqlite3.connect(db_path)
+    summary = pd.read_sql_query("SELECT * FROM crop_summary", conn).set_index("Crop_Type")
+    conn.close()
+
+    farms = pd.read_csv(init_db.FARM_DATA_PATH)
+    expected = farms.groupby("Crop_Type")["Crop_Yield_ton"].mean()
+    pd.testing.assert_series_equal(
+        summary["Avg_Yield"].sort_index(), expected.sort_index(), check_names=False
+    )
+
+
+def test_ingest_refreshes_only_touched_summaries(tmp_path):
+    db_path = _build(tmp_path)
+    batch = pd.read_csv(init_db.MARKET_DATA_PATH).head(1)
+    batch["Market_ID"] = 999999
+    batch["Market_Price_per_ton"] = 1e6
+    product = batch.loc[0, "Product"]
+    batch_path = tmp_path / "markets_batch.csv"
+    batch.to_csv(batch_path, index=False)
+
+    conn = sqlite3.connect(db_path)
+    before = dict(conn.execute("SELECT Product, Avg_Price FROM market_summary").fetchall())
+    conn.close()
+
+    init_db.ingest(market_path=str(batch_path), db_path=db_path)
+
+    conn = sqlite3.connect(db_path)
+    after = dict(conn.execute("SELECT Product, Avg_Price FROM market_summary").fetchall())
+    conn.close()
+
+    assert after[product] > before[product]
+    assert all(after[p] == before[p] for p in before if p != product)
@@ -0,0 +1,26 @@
+import time
+
+from utils.request_executor import StageExecutor
+
+
+def test_stages_run_concurrently_with_fallbacks():
+    executor = StageExecutor(max_workers=8)
+    stages = executor.group(default_timeout=2.0)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    started = time.monotonic()
+    for i in range(4):
+        stages.add(("sleep", i), lambda i=i: time.sleep(0.2) or i)
+    stages.add("slow", time.sleep, 1.0, fallback="late", timeout=0.1)
+    stages.add("broken", fail, fallback="default")
+    results = stages.results()
+    elapsed = time.monotonic() - started
+    executor.shutdown(wait=True)
+
+    assert [results[("sleep", i)] for i in range(4)] == [0, 1, 2, 3]
+    assert results["slow"] == "late"
+    assert results["broken"] == "default"
+    assert stages.fell_back == {"slow", "broken"}
+    assert elapsed < 0.6
@@ -0,0 +1,33 @@
+from utils.response_cache import ResponseCache
+
+
+def test_lru_and_scope_expiry():
+    cache = ResponseCache(max_entries=2)
+    key = ResponseCache.make_key({"Soil_pH": 6.5, "Location": "Warangal"})
+    assert key == ResponseCache.make_key({"Location": "Warangal", "Soil_pH": 6.5})
+
+    cache.set(key, "2026-10", ["result"])
+    assert cache.get(key, "2026-10") == ["result"]
+    assert cache.get(key, "2026-11") is None
+
+    cache.set("b", "2026-10", 2)
+    cache.set("c", "2026-10", 3)
+    assert cache.get(key, "2026-10") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_sqlite_tier_is_shared_and_invalidated(tmp_path):
+    db_path = str(tmp_path / "responses.db")
+    first = ResponseCache(db_path=db_path)
+    second = ResponseCache(db_path=db_path)
+
+    first.set("key", "2026-10", {"crops": ["Rice"]})
+    assert second.get("key", "2026-10") == {"crops": ["Rice"]}
+    assert second.stats()["disk_hits"] == 1
+
+    # A write in a new scope purges entries that can no longer be hit
+    first.set("other", "2026-11", 1)
+    assert ResponseCache(db_path=db_path).get("key", "2026-10") is None
+
+    second.invalidate()
+    assert first._disk_get("other", "2026-11") is None
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from core.sustainability import calculate_sustainability_score, calculate_sustainability_scores
+from utils.datasets import registry
+
+
+def test_vectorized_scores_match_scalar():
+    df = registry.get("farms")
+    expected = df.apply(calculate_sustainability_score, axis=1).to_numpy()
+
+    np.testing.assert_array_equal(calculate_sustainability_scores(df), expected)
+
+
+def test_vectorized_scores_clip_to_range():
+    df = pd.DataFrame({
+        "Soil_pH": [6.5, 14.0],
+        "Soil_Moisture": [25, 100],
+        "Temperature_C": [30, 90],
+        "Rainfall_mm": [100, 1000],
+    })
+    scores = calculate_sustainability_scores(df)
+
+    assert scores[0] == 100
+    assert scores[1] == 0
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from core.weather_integration import WeatherIntegration
+
+
+def test_forecast_is_deterministic_within_a_month():
+    weather = WeatherIntegration()
+    forecast = weather.get_weather_forecast("Warangal", 4)
+
+    assert len(forecast) == 5
+    assert forecast["confidence"].tolist() == [100, 80, 60, 40, 20]
+    assert forecast["humidity_pct"].between(10, 100).all()
+    assert (forecast["rainfall_mm"] >= 0).all()
+    assert WeatherIntegration().get_weather_forecast("Warangal", 4).equals(forecast)
+    assert not weather.get_weather_forecast("Khammam", 4)["temperature_C"].equals(forecast["temperature_C"])
+
+
+def test_results_are_memoized_per_month(monkeypatch):
+    weather = WeatherIntegration()
+    history = weather.get_historical_weather("Karimnagar", 6)
+    history.loc[0, "temperature_C"] = -99
+
+    assert weather.get_historical_weather("Karimnagar", 6).loc[0, "temperature_C"] != -99
+    assert len(weather._cache) == 1
+
+    next_month = weather._current_month() + pd.DateOffset(months=1)
+    monkeypatch.setattr(weather, "_current_month", lambda: next_month)
+    later = weather.get_historical_weather("Karimnagar", 6)
+
+    assert later["date"].iloc[-1] == next_month
+    assert len(weather._cache) == 1
+
+
+def test_yield_impact_many_matches_single_crop_calls():
+    weather = WeatherIntegration()
+    crops = ["Rice", "Wheat", "Corn", "Mango"]
+    many = weather.calculate_yield_impact_many(crops, "Nizamabad", "2026-06-15")
+
+    assert list(many) == crops
+    assert many["Mango"]["impact_factor"] == 1.0
+    for crop in crops:
+        assert weather.calculate_yield_impact(crop, "Nizamabad", "2026-06-15") == many[crop]
+        assert 0.5 <= many[crop]["impact_factor"] <= 1.5
+
+
+def test_planting_window_aggregates_match_direct_sums():
+    weather = WeatherIntegration()
+    planting = pd.date_range("2026-02-01", periods=400, freq="D")
+    windows = weather.planting_window_aggregates("Adilabad", planting, season_days=90)
+
+    assert len(windows) == 400
+    for date in [planting[0], planting[137], planting[-1]]:
+        daily = weather.get_daily_weather("Adilabad", date, date + pd.Timedelta(days=89))
+        row = windows.loc[date]
+        assert row["growing_degree_days"] == pytest.approx((daily["temperature_C"] - 10).clip(lower=0).sum())
+        assert row["cumulative_rainfall_mm"] == pytest.approx(daily["rainfall_mm"].sum())
+        assert row["humidity_stress_days"] == (~daily["humidity_pct"].between(40, 85)).sum()
+
+
+def test_daily_weather_is_stable_across_ranges():
+    weather = WeatherIntegration()
+    wide = weather.get_daily_weather("Khammam", "2025-11-01", "2026-02-28").set_index("date")
+    narrow = weather.get_daily_weather("Khammam", "2026-01-10", "2026-01-20").set_index("date")
+
+    assert len(wide) == 120
+    assert narrow.equals(wide.loc[narrow.index])
+
+    impact = weather.calculate_yield_impact("Wheat", "Khammam", "2026-01-10", resolution="daily")
+    assert "growing_degree_days" in impact and "humidity_stress_days" in impact
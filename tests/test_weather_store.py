@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from core.weather_integration import WeatherIntegration
+from core.weather_sources import StoreWeatherSource
+from utils.weather_store import WeatherStore
+
+
+def _daily(start, days, temperature=25.0):
+    dates = pd.date_range(start, periods=days, freq="D")
+    return pd.DataFrame({
+        "date": dates,
+        "temperature_C": temperature + np.arange(days) % 5,
+        "rainfall_mm": np.full(days, 2.0),
+        "humidity_pct": np.full(days, 60.0),
+    })
+
+
+def test_append_partitions_by_month_and_skips_old_days(tmp_path):
+    store = WeatherStore(str(tmp_path))
+
+    assert store.append("Warangal", _daily("2024-01-20", 20)) == 20
+    assert store.months("Warangal") == ["2024-01", "2024-02"]
+    # Overlapping batch: only days after the last stored one are appended
+    assert store.append("Warangal", _daily("2024-02-01", 20)) == 12
+    assert store.append("Warangal", _daily("2024-01-01", 5)) == 0
+
+    window = store.read("Warangal", "2024-01-31", "2024-02-02")
+    assert window["date"].dt.strftime("%Y-%m-%d").tolist() == ["2024-01-31", "2024-02-01", "2024-02-02"]
+    assert store.read("Warangal", "2023-01-01", "2023-12-31").empty
+    assert store.read("Khammam", "2024-01-01", "2024-12-31").empty
+
+
+def test_historical_weather_reads_store_months(tmp_path, monkeypatch):
+    store = WeatherStore(str(tmp_path))
+    store.append("Warangal", _daily("2024-01-01", 60))
+    weather = WeatherIntegration(source=StoreWeatherSource(store))
+    monkeypatch.setattr(weather, "_current_month", lambda: pd.Timestamp("2024-03-01"))
+
+    history = weather.get_historical_weather("Warangal", months_back=2)
+    assert history["date"].tolist() == [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-01")]
+    assert history["rainfall_mm"].tolist() == [62.0, 58.0]
+
+    store.append("Warangal", _daily("2024-03-01", 3))
+    assert len(weather.get_historical_weather("Warangal", months_back=2)) == 3
+    # Stations without records fall back to the simulator
+    assert len(weather.get_historical_weather("Khammam", months_back=2)) == 3
+
+
+def test_daily_weather_prefers_stored_records(tmp_path):
+    store = WeatherStore(str(tmp_path))
+    store.append("Warangal", _daily("2024-01-01", 10, temperature=40.0))
+    weather = WeatherIntegration(source=StoreWeatherSource(store))
+
+    daily = weather.get_daily_weather("Warangal", "2024-01-05", "2024-01-14")
+    simulated = WeatherIntegration().get_daily_weather("Warangal", "2024-01-05", "2024-01-14")
+
+    assert daily["temperature_C"].iloc[:6].tolist() == [44.0, 40.0, 41.0, 42.0, 43.0, 44.0]
+    assert daily["temperature_C"].iloc[6:].tolist() == simulated["temperature_C"].iloc[6:].tolist()
+
+
+def test_daily_impact_uses_store_only_station(tmp_path):
+    store = WeatherStore(str(tmp_path))
+    store.append("Medak", _daily("2024-01-01", 200, temperature=5.0))
+    weather = WeatherIntegration(source=StoreWeatherSource(store))
+
+    impact = weather.calculate_yield_impact("Wheat", "Medak", "2024-01-10", resolution="daily")
+
+    assert impact["growing_degree_days"] == 0
+    assert "based on Medak" in impact["forecast_summary"]
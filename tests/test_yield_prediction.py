@@ -0,0 +1,182 @@
+import json
+import shutil
+
+import pandas as pd
+import pytest
+
+from core.yield_prediction import YieldPredictor
+from utils.datasets import registry
+
+
+@pytest.fixture(scope="module")
+def predictor(tmp_path_factory):
+    return YieldPredictor(load_pretrained=False, models_dir=str(tmp_path_factory.mktemp("models")))
+
+
+def _records(n=25):
+    farms = registry.get("farms")
+    farms = farms[farms["Crop_Type"] == "Rice"].head(n)
+    records = []
+    for i, (_, row) in enumerate(farms.iterrows()):
+        record = {
+            "Soil_pH": row["Soil_pH"],
+            "Rainfall_mm": row["Rainfall_mm"] * (3 if i % 4 == 0 else 1),
+            "Temperature_C": row["Temperature_C"],
+            "Field_Size_hectare": row["Soil_Moisture"],
+            "Fertilizer_Use_kg": row["Fertilizer_Usage_kg"],
+        }
+        if i % 3 == 0:
+            record["Pesticide_Use_kg"] = row["Pesticide_Usage_kg"]
+        records.append(record)
+    return records
+
+
+def test_batch_matches_single_predictions(predictor):
+    records = _records()
+    batch = predictor.predict_yield_batch("Rice", records, weather_impact=0.8)
+
+    assert list(batch.index) == list(range(len(records)))
+    for i, record in enumerate(records):
+        single = predictor.predict_yield("Rice", record, 0.8)
+        assert batch.loc[i, "base_yield"] == pytest.approx(single["base_yield"])
+        assert batch.loc[i, "yield_prediction"] == pytest.approx(single["yield_prediction"])
+        assert batch.loc[i, "confidence"] == single["confidence"]
+
+
+def test_batch_accepts_dataframe_and_unknown_crop(predictor):
+    frame = pd.DataFrame(_records(5), index=list("abcde"))
+
+    batch = predictor.predict_yield_batch("Rice", frame)
+    assert list(batch.index) == list("abcde")
+    assert batch["yield_prediction"].notna().all()
+
+    missing = predictor.predict_yield_batch("Cotton", frame)
+    assert missing["yield_prediction"].isna().all()
+    assert (missing["confidence"] == 0).all()
+
+
+def test_artifacts_are_persisted_and_reloaded(predictor):
+    record = _records(1)[0]
+    expected = predictor.predict_yield("Rice", record)
+
+    reloaded = YieldPredictor(load_pretrained=True, models_dir=predictor.models_dir)
+    artifacts = reloaded._load_artifacts("Rice")
+
+    assert artifacts.feature_columns == predictor.artifacts["Rice"].feature_columns
+    assert artifacts.q25.tolist() == predictor.artifacts["Rice"].q25.tolist()
+    assert reloaded.predict_yield("Rice", record) == expected
+
+    farms = registry.get("farms")
+    rice = farms[farms["Crop_Type"] == "Rice"].describe()
+    assert artifacts.q75[0] == pytest.approx(rice[artifacts.range_features[0]]["75%"])
+    assert expected["yield_prediction"] is not None
+
+
+def test_models_load_lazily_into_bounded_lru(predictor):
+    predictor.predict_yield("Rice", _records(1)[0])
+    lazy = YieldPredictor(load_pretrained=True, models_dir=predictor.models_dir, max_models=1)
+
+    assert lazy.model_cache_stats()["models"] == 0
+    changes = []
+    lazy.model_registry.on_change(changes.append)
+
+    lazy.predict_yield("Rice", _records(1)[0])
+    lazy.predict_yield("Rice", _records(1)[0])
+    lazy.predict_yield("Wheat", _records(1)[0])
+    stats = lazy.model_cache_stats()
+
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+    assert list(lazy.models) == ["Wheat"]
+    # Lazy loads and refills are not model changes; replacing a model is
+    assert changes == []
+    lazy.model_registry.put("Wheat", lazy.model_registry.peek("Wheat"))
+    assert changes == ["Wheat"]
+
+
+def test_stale_model_header_forces_retrain(predictor, tmp_path):
+    predictor.predict_yield("Rice", _records(1)[0])
+    models_dir = tmp_path / "models"
+    shutil.copytree(predictor.models_dir, models_dir)
+    meta_path = models_dir / "Rice_model_meta.json"
+    meta = json.loads(meta_path.read_text())
+    assert meta["store"]["feature_columns"] == meta["feature_columns"]
+
+    fresh = YieldPredictor(models_dir=str(models_dir))
+    assert fresh._load_saved_model("Rice") is not None
+
+    meta["store"]["sklearn_version"] = "0.0"
+    meta_path.write_text(json.dumps(meta))
+    assert fresh._load_saved_model("Rice") is None
+
+
+def test_update_models_only_touches_changed_crops(tmp_path):
+    farms = registry.get("farms")
+    earlier = farms.iloc[:-300]
+    yp = YieldPredictor(models_dir=str(tmp_path))
+
+    assert yp.update_models(earlier, ["Rice"]) == {"Rice": "retrained"}
+    assert yp.update_models(earlier, ["Rice"]) == {"Rice": "unchanged"}
+
+    assert yp.update_models(farms, ["Rice"], extra_trees=10) == {"Rice": "warm_start"}
+    assert len(yp.models["Rice"].estimators_) == 110
+    assert yp._read_meta("Rice")["store"]["n_samples"] == int((farms["Crop_Type"] == "Rice").sum())
+
+    edited = farms.copy()
+    first_rice = edited.index[edited["Crop_Type"] == "Rice"][0]
+    edited.loc[first_rice, "Crop_Yield_ton"] += 1
+    assert yp.update_models(edited, ["Rice"]) == {"Rice": "retrained"}
+
+
+def test_legacy_pickle_is_migrated(tmp_path):
+    for name in ("Rice_yield_model.pkl", "Rice_scaler.pkl"):
+        shutil.copy(f"models/{name}", tmp_path / name)
+
+    legacy = YieldPredictor(models_dir=str(tmp_path))
+    expected = legacy.predict_yield("Rice", _records(1)[0])
+    assert (tmp_path / "Rice_yield_model.joblib").exists()
+
+    migrated = YieldPredictor(models_dir=str(tmp_path))
+    assert migrated.predict_yield("Rice", _records(1)[0]) == expected
+    header = migrated._read_meta("Rice")["store"]
+    assert header["model_file"] == "Rice_yield_model.joblib"
+    # Unknown provenance: the first update retrains rather than trusting it
+    assert header["training_data_hash"] is None and header["n_samples"] is None
+    assert migrated.update_models(crop_types=["Rice"]) == {"Rice": "retrained"}
+
+
+def test_background_training_serves_fallback_until_ready(tmp_path):
+    yp = YieldPredictor(models_dir=str(tmp_path), background_training=True, training_workers=2)
+    try:
+        record = _records(1)[0]
+        warming = yp.predict_yield("Rice", record)
+        assert warming["model_warming"] is True
+        assert warming["base_yield"] == round(yp._mean_yield("Rice"), 2)
+
+        assert yp.train_all(["Rice", "Wheat"], timeout=120) == {"Rice": True, "Wheat": True}
+
+        ready = yp.predict_yield("Rice", record)
+        assert "model_warming" not in ready
+        assert ready["confidence"] > 0 or ready["yield_prediction"] is not None
+    finally:
+        yp.shutdown()
+
+
+def test_failed_background_training_backs_off(tmp_path, monkeypatch):
+    from concurrent.futures import Future
+
+    yp = YieldPredictor(models_dir=str(tmp_path), background_training=True, training_retry_seconds=60)
+    scheduled = []
+    monkeypatch.setattr(yp, "train_async", lambda crops: scheduled.extend(crops))
+    failed = Future()
+    failed.set_exception(RuntimeError("worker died"))
+    yp._on_training_done("Rice", None, None, failed)
+
+    result = yp.predict_yield("Rice", _records(1)[0])
+    assert result["yield_prediction"] is None and "model_warming" not in result
+    assert scheduled == []
+
+    yp._training_failures["Rice"] = 0
+    yp.predict_yield("Rice", _records(1)[0])
+    assert scheduled == ["Rice"]
@@ -0,0 +1,71 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+# Payloads smaller than this are not worth compressing
+MIN_GZIP_SIZE = 1024
+
+ChartPayload = namedtuple("ChartPayload", ["body", "gzipped", "etag"])
+
+
+class ChartCache:
+    """Serialized chart payloads keyed by chart type, subject and data version.
+
+    Each entry holds the encoded body, a gzip copy made once at build time
+    (None when it would not save anything) and an ETag derived from the
+    body, so repeat requests are answered without rebuilding the figure and
+    revalidations without sending it. A new data version produces a new key;
+    entries for old versions age out of the LRU.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_payload(body):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        gzipped = None
+        if len(body) >= MIN_GZIP_SIZE:
+            # mtime=0 keeps the compressed bytes identical across rebuilds
+            gzipped = gzip.compress(body, compresslevel=6, mtime=0)
+            if len(gzipped) >= len(body):
+                gzipped = None
+        return ChartPayload(body, gzipped, hashlib.sha1(body).hexdigest())
+
+    def get_or_build(self, chart, subject, version, build):
+        """Cached payload for ``(chart, subject, version)``, calling
+        ``build()`` for the serialized body on a miss"""
+        key = (chart, subject, version)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return payload
+            self._stats["misses"] += 1
+
+        payload = self.make_payload(build())
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def clear(self, *args):
+        """Drop every payload. Accepts and ignores callback arguments so it
+        can be registered directly as a reload hook."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        return stats
@@ -0,0 +1,170 @@
+import os
+import threading
+import logging
+import weakref
+
+import pandas as pd
+
+from utils.snapshots import build_snapshot, load_snapshot
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "data", "snapshots")
+
+# Source files and explicit dtypes for every shared dataset. Declaring dtypes
+# skips pandas' type inference and stores the repeated labels as categoricals.
+DATASETS = {
+    "farms": {
+        "path": os.path.join(BASE_DIR, "data", "farmer_advisor_dataset.csv"),
+        "snapshot": os.path.join(SNAPSHOT_DIR, "farms"),
+        "dtype": {
+            "Farm_ID": "int64",
+            "Soil_pH": "float64",
+            "Soil_Moisture": "float64",
+            "Temperature_C": "float64",
+            "Rainfall_mm": "float64",
+            "Crop_Type": "category",
+            "Fertilizer_Usage_kg": "float64",
+            "Pesticide_Usage_kg": "float64",
+            "Crop_Yield_ton": "float64",
+            "Sustainability_Score": "float64",
+        },
+    },
+    "markets": {
+        "path": os.path.join(BASE_DIR, "data", "market_researcher_dataset.csv"),
+        "snapshot": os.path.join(SNAPSHOT_DIR, "markets"),
+        "dtype": {
+            "Market_ID": "int64",
+            "Product": "category",
+            "Market_Price_per_ton": "float64",
+            "Demand_Index": "float64",
+            "Supply_Index": "float64",
+            "Competitor_Price_per_ton": "float64",
+            "Economic_Indicator": "float64",
+            "Weather_Impact_Score": "float64",
+            "Seasonal_Factor": "category",
+            "Consumer_Trend_Index": "float64",
+        },
+    },
+}
+
+
+def _freeze(df):
+    """Rebuild ``df`` on per-column read-only buffers so shared views cannot
+    be modified in place by one component behind another's back"""
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy(copy=True)
+            codes.flags.writeable = False
+            values = pd.Categorical.from_codes(codes, dtype=column.dtype)
+        else:
+            values = column.to_numpy(copy=True)
+            values.flags.writeable = False
+        columns[name] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+class DatasetRegistry:
+    """Loads each dataset once per process and hands out read-only views.
+
+    Components call :meth:`get` instead of reading the CSV themselves and may
+    register a callback with :meth:`on_reload` to rebuild derived state when
+    :meth:`reload` swaps in fresh data.
+    """
+
+    def __init__(self, datasets=None):
+        self.datasets = datasets or DATASETS
+        self._frames = {}
+        self._versions = {}
+        self._hooks = []
+        self._lock = threading.RLock()
+
+    def _load(self, name):
+        spec = self.datasets[name]
+        if spec.get("snapshot"):
+            # Memory-mapped .npy columns are already read-only
+            df = load_snapshot(spec["path"], spec["snapshot"])
+            if df is not None:
+                logging.info(f"Mapped {len(df)} rows for dataset '{name}' from snapshot {spec['snapshot']}")
+                return df
+        df = pd.read_csv(spec["path"], dtype=spec.get("dtype"))
+        logging.info(f"Loaded {len(df)} rows for dataset '{name}' from {spec['path']}")
+        return _freeze(df)
+
+    def get(self, name):
+        """Return a read-only view of dataset ``name``, loading it on first use"""
+        with self._lock:
+            if name not in self._frames:
+                self._frames[name] = self._load(name)
+                self._versions[name] = self._versions.get(name, 0) + 1
+            frame = self._frames[name]
+        # Shallow copy: shares the frozen buffers but lets callers add columns
+        return frame.copy(deep=False)
+
+    def version(self, name):
+        """Monotonic counter that changes whenever ``name`` is (re)loaded"""
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def reload(self, name=None):
+        """Re-read one dataset (or all loaded ones) and notify subscribers"""
+        with self._lock:
+            names = [name] if name else list(self._frames) or list(self.datasets)
+            for dataset in names:
+                self._frames[dataset] = self._load(dataset)
+                self._versions[dataset] = self._versions.get(dataset, 0) + 1
+            hooks = list(self._hooks)
+
+        for ref in hooks:
+            callback = ref()
+            if callback is None:
+                continue
+            for dataset in names:
+                try:
+                    callback(dataset)
+                except Exception as e:
+                    logging.error(f"Dataset reload hook failed for '{dataset}': {e}")
+
+        with self._lock:
+            self._hooks = [ref for ref in self._hooks if ref() is not None]
+
+    def on_reload(self, callback):
+        """Call ``callback(name)`` after a dataset is reloaded.
+
+        Bound methods are held weakly so registering does not keep the
+        owning component alive.
+        """
+        try:
+            ref = weakref.WeakMethod(callback)
+        except TypeError:
+            ref = lambda: callback
+        with self._lock:
+            self._hooks.append(ref)
+
+    def clear(self):
+        """Drop cached frames; the next :meth:`get` reloads from source"""
+        with self._lock:
+            self._frames.clear()
+
+
+def build_snapshots(datasets=None):
+    """Parse each source CSV once and write its columnar snapshot"""
+    datasets = datasets or DATASETS
+    for name, spec in datasets.items():
+        if spec.get("snapshot"):
+            df = pd.read_csv(spec["path"], dtype=spec.get("dtype"))
+            build_snapshot(df, spec["path"], spec["snapshot"])
+
+
+registry = DatasetRegistry()
+
+
+def get_farm_dataset():
+    """Shared read-only view of the farmer advisor dataset"""
+    return registry.get("farms")
+
+
+def get_market_dataset():
+    """Shared read-only view of the market researcher dataset"""
+    return registry.get("markets")
@@ -1,20 +1,175 @@
+import os
+import queue
 import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+
 import pandas as pd
 
-def connect_db(path="database/agro_system.db"):
-    return sqlite3.connect(path)
+DEFAULT_DB_PATH = "database/agro_system.db"
+
+# Pragmas applied to every pooled connection. mmap_size lets SQLite read pages
+# straight from the OS page cache; a negative cache_size is measured in KiB.
+DEFAULT_PRAGMAS = {
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def connect_db(path=DEFAULT_DB_PATH, read_only=False, pragmas=None):
+    """Open a new SQLite connection, optionally read-only via a URI"""
+    if read_only:
+        uri = f"file:{os.path.abspath(path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets readers keep working while an ingest job writes
+        conn.execute("PRAGMA journal_mode=WAL")
+    for name, value in (pragmas or {}).items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of SQLite connections for one database file.
+
+    Connections are opened lazily up to ``max_size`` and handed out through
+    :meth:`connection`. Threads block for up to ``timeout`` seconds when every
+    connection is checked out.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, max_size=8, read_only=True,
+                 pragmas=None, timeout=30.0):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.read_only = read_only
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._stats = {"acquired": 0, "released": 0, "waits": 0, "discarded": 0}
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.max_size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+                self._stats["waits"] += 1
+
+        if create:
+            try:
+                return connect_db(self.db_path, read_only=self.read_only, pragmas=self.pragmas)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No database connection available for {self.db_path} after {self.timeout}s"
+            )
+
+    def _release(self, conn, broken=False):
+        if broken:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+                self._stats["discarded"] += 1
+            return
+        if not self.read_only:
+            conn.rollback()
+        with self._lock:
+            self._stats["released"] += 1
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Check a connection out of the pool for the duration of the block"""
+        conn = self._acquire()
+        with self._lock:
+            self._stats["acquired"] += 1
+        broken = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError:
+            broken = True
+            raise
+        finally:
+            self._release(conn, broken=broken)
+
+    def stats(self):
+        """Return a snapshot of pool counters for monitoring"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["created"] = self._created
+        stats["idle"] = self._idle.qsize()
+        stats["in_use"] = stats["created"] - stats["idle"]
+        stats["max_size"] = self.max_size
+        stats["read_only"] = self.read_only
+        return stats
+
+    def close(self):
+        """Close every idle connection and reset the pool"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=DEFAULT_DB_PATH, read_only=True, **kwargs):
+    """Return the shared pool for ``db_path``, creating it on first use"""
+    key = (os.path.abspath(db_path), read_only)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_path, read_only=read_only, **kwargs)
+            _pools[key] = pool
+            logging.info(f"Created {'read-only' if read_only else 'read-write'} connection pool for {db_path}")
+        return pool
+
+
+def get_pool_stats():
+    """Stats for every pool keyed by database path and access mode"""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {f"{path} ({'ro' if ro else 'rw'})": pool.stats() for (path, ro), pool in pools}
+
 
-def query_to_dataframe(query, params=None, db_path="database/agro_system.db"):
+def close_pools():
+    """Close all pooled connections, e.g. after the database file is rebuilt"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def query_to_dataframe(query, params=None, db_path=DEFAULT_DB_PATH):
     """Execute SQL query and return results as pandas DataFrame"""
-    conn = connect_db(db_path)
-    try:
+    with get_pool(db_path).connection() as conn:
         if params:
-            df = pd.read_sql_query(query, conn, params=params)
-        else:
-            df = pd.read_sql_query(query, conn)
-        return df
-    finally:
-        conn.close()
+            return pd.read_sql_query(query, conn, params=params)
+        return pd.read_sql_query(query, conn)
 
 def get_farm_data(farm_id=None):
     """Get all farm data or for a specific farm_id"""
@@ -34,9 +189,9 @@ def get_crop_recommendations(soil_ph, rainfall, temperature):
     """Get recommended crops based on soil and climate conditions"""
     # Widen the search criteria to ensure results
     query = """
-    SELECT Crop_Type, AVG(Crop_Yield_ton) as Avg_Yield, 
+    SELECT Crop_Type, AVG(Crop_Yield_ton) as Avg_Yield,
            COUNT(*) as Sample_Count
-    FROM farms 
+    FROM farms
     WHERE Soil_pH BETWEEN ? AND ?
     GROUP BY Crop_Type
     HAVING Sample_Count >= 5
@@ -45,7 +200,7 @@ def get_crop_recommendations(soil_ph, rainfall, temperature):
     # Using a wider pH range to ensure we get results
     params = (soil_ph-1.0, soil_ph+1.0)
     result = query_to_dataframe(query, params=params)
-    
+
     # If still no results, return top crops regardless of conditions
     if result.empty:
         query = """
@@ -55,16 +210,81 @@ def get_crop_recommendations(soil_ph, rainfall, temperature):
         ORDER BY Avg_Yield DESC
         """
         result = query_to_dataframe(query)
-    
+
     return result
 
+def _summary_or_fallback(summary_query, fallback_query, params=None):
+    """Read a materialized summary table, recomputing from the base table if
+    the database predates the summary tables built by database/init_db.py"""
+    try:
+        return query_to_dataframe(summary_query, params=params)
+    except pd.errors.DatabaseError:
+        logging.warning("Summary table missing; falling back to a full aggregate scan")
+        return query_to_dataframe(fallback_query, params=params)
+
 def get_market_trends():
     """Analyze market trends to find profitable crops"""
-    query = """
-    SELECT Product, AVG(Market_Price_per_ton) as Avg_Price, 
+    summary_query = """
+    SELECT Product, Avg_Price, Avg_Demand
+    FROM market_summary
+    ORDER BY (Avg_Price * Avg_Demand) DESC
+    """
+    fallback_query = """
+    SELECT Product, AVG(Market_Price_per_ton) as Avg_Price,
            AVG(Demand_Index) as Avg_Demand
     FROM markets
     GROUP BY Product
     ORDER BY (Avg_Price * Avg_Demand) DESC
     """
-    return query_to_dataframe(query)
+    return _summary_or_fallback(summary_query, fallback_query)
+
+def get_market_opportunities(limit=3):
+    """Products whose average demand exceeds average supply"""
+    summary_query = """
+    SELECT Product, Avg_Demand, Avg_Supply,
+           (Avg_Demand - Avg_Supply) as Opportunity_Score
+    FROM market_summary
+    WHERE Avg_Demand > Avg_Supply
+    ORDER BY Opportunity_Score DESC
+    LIMIT ?
+    """
+    fallback_query = """
+    SELECT Product, AVG(Demand_Index) as Avg_Demand, AVG(Supply_Index) as Avg_Supply,
+           (AVG(Demand_Index) - AVG(Supply_Index)) as Opportunity_Score
+    FROM markets
+    GROUP BY Product
+    HAVING Avg_Demand > Avg_Supply
+    ORDER BY Opportunity_Score DESC
+    LIMIT ?
+    """
+    return _summary_or_fallback(summary_query, fallback_query, params=(limit,))
+
+def get_market_summary():
+    """Per-product average price, demand, supply and profitability"""
+    summary_query = """
+    SELECT Product, Row_Count, Avg_Price, Avg_Demand, Avg_Supply, Avg_Profitability
+    FROM market_summary
+    """
+    fallback_query = """
+    SELECT Product, COUNT(*) as Row_Count, AVG(Market_Price_per_ton) as Avg_Price,
+           AVG(Demand_Index) as Avg_Demand, AVG(Supply_Index) as Avg_Supply,
+           AVG(Market_Price_per_ton * Demand_Index / MAX(Supply_Index, 0.1)) as Avg_Profitability
+    FROM markets
+    GROUP BY Product
+    """
+    return _summary_or_fallback(summary_query, fallback_query)
+
+def get_crop_summary():
+    """Per-crop yield and sustainability statistics"""
+    summary_query = """
+    SELECT Crop_Type, Row_Count, Avg_Yield, Min_Yield, Max_Yield, Avg_Sustainability
+    FROM crop_summary
+    """
+    fallback_query = """
+    SELECT Crop_Type, COUNT(*) as Row_Count, AVG(Crop_Yield_ton) as Avg_Yield,
+           MIN(Crop_Yield_ton) as Min_Yield, MAX(Crop_Yield_ton) as Max_Yield,
+           AVG(Sustainability_Score) as Avg_Sustainability
+    FROM farms
+    GROUP BY Crop_Type
+    """
+    return _summary_or_fallback(summary_query, fallback_query)
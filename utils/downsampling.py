@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+METHODS = ("lttb", "minmax")
+# Aggregation periods accepted by aggregate_series
+PERIODS = {"daily": "D", "weekly": "W"}
+
+
+def _numeric(values):
+    """Float view of numeric or datetime values for distance arithmetic"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype("datetime64[ns]").astype(np.int64)
+    return values.astype(np.float64)
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; the rest are split into
+    ``threshold - 2`` buckets and from each the point forming the largest
+    triangle with the previously kept point and the next bucket's average
+    is selected, which preserves peaks and troughs. ``x`` must be sorted.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x, y = _numeric(x), _numeric(y)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, threshold):
+    """Indices of the minimum and maximum of each of ``threshold // 2``
+    equal-count buckets, in their original order"""
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    y = _numeric(y)
+    edges = np.linspace(0, n, max(1, threshold // 2) + 1).astype(np.intp)
+    keep = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            keep.extend((lo + int(np.argmin(y[lo:hi])), lo + int(np.argmax(y[lo:hi]))))
+    return np.unique(keep)
+
+
+def aggregate_series(df, x, y, period, group=None):
+    """Mean of ``y`` per ``period`` ("daily" or "weekly") of the datetime
+    column ``x``, separately for each value of ``group``"""
+    if period not in PERIODS:
+        raise ValueError(f"Unknown aggregation period: {period}")
+    buckets = df[x].dt.to_period(PERIODS[period]).dt.start_time.rename(x)
+    keys = [df[group], buckets] if group else [buckets]
+    return df.groupby(keys, sort=False, observed=True)[y].mean().reset_index()
+
+
+def downsample(df, x, y, max_points, group=None, method="lttb"):
+    """Reduce each series (one per value of ``group``) to at most
+    ``max_points`` rows, sorted by ``x``. Series already within budget are
+    returned whole. Groups keep their order of first appearance."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    def reduce(series):
+        series = series.sort_values(x, kind="stable")
+        if method == "lttb":
+            keep = lttb_indices(series[x].to_numpy(), series[y].to_numpy(), max_points)
+        else:
+            keep = minmax_indices(series[y].to_numpy(), max_points)
+        return series.iloc[keep]
+
+    if group is None:
+        return reduce(df)
+    parts = [reduce(series) for _, series in df.groupby(group, sort=False, observed=True)]
+    return pd.concat(parts) if parts else df.iloc[:0]
@@ -0,0 +1,59 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class StageGroup:
+    """The stages of a single request, submitted to a shared thread pool.
+
+    Every stage has a deadline measured from when it was added and a
+    fallback value. :meth:`results` waits for each stage until its deadline
+    and substitutes the fallback for stages that fail or overrun, so the
+    request can still be answered with partial results. The keys that fell
+    back are listed in :attr:`fell_back` once :meth:`results` returns.
+    """
+
+    def __init__(self, pool, default_timeout):
+        self._pool = pool
+        self.default_timeout = default_timeout
+        self._stages = {}
+        self.fell_back = set()
+
+    def add(self, key, func, *args, fallback=None, timeout=None):
+        """Start ``func(*args)`` in the background under ``key``"""
+        deadline = time.monotonic() + (self.default_timeout if timeout is None else timeout)
+        self._stages[key] = (self._pool.submit(func, *args), fallback, deadline)
+
+    def results(self):
+        """Wait for every stage and return its result (or fallback) by key"""
+        results = {}
+        for key, (future, fallback, deadline) in self._stages.items():
+            try:
+                results[key] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                # The worker thread keeps running; its result is discarded
+                future.cancel()
+                logging.warning(f"Stage {key} timed out; using fallback")
+                results[key] = fallback
+                self.fell_back.add(key)
+            except Exception as e:
+                logging.error(f"Stage {key} failed: {e}")
+                results[key] = fallback
+                self.fell_back.add(key)
+        return results
+
+
+class StageExecutor:
+    """Shared thread pool for running the independent stages of a request
+    concurrently, so latency approaches the slowest stage rather than the sum"""
+
+    def __init__(self, max_workers=16, default_timeout=10.0):
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="request-stage")
+
+    def group(self, default_timeout=None):
+        """Start a new request-scoped group of stages"""
+        return StageGroup(self._pool, self.default_timeout if default_timeout is None else default_timeout)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
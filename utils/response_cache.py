@@ -0,0 +1,118 @@
+import json
+import pickle
+import hashlib
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+
+from utils.db_utils import ConnectionPool
+
+
+class ResponseCache:
+    """Cache of computed responses with an in-process LRU and an optional
+    SQLite tier that several worker processes can share.
+
+    Every entry belongs to a ``scope`` (e.g. the forecast month); looking a
+    key up under a different scope is a miss, so entries expire when the
+    scope moves on. :meth:`invalidate` empties both tiers.
+    """
+
+    def __init__(self, max_entries=256, db_path=None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "invalidations": 0}
+        self._pool = None
+        if db_path:
+            self._pool = ConnectionPool(db_path, max_size=4, read_only=False, pragmas={})
+            with self._pool.connection() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS response_cache "
+                    "(key TEXT PRIMARY KEY, scope TEXT NOT NULL, value BLOB NOT NULL)"
+                )
+                conn.commit()
+
+    @staticmethod
+    def make_key(parts):
+        """Stable digest of a JSON-serializable description of the request"""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key, scope):
+        """Cached value for ``key`` in ``scope``, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == scope:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+
+        value = self._disk_get(key, scope)
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, scope, value)
+        return value
+
+    def set(self, key, scope, value):
+        with self._lock:
+            self._remember(key, scope, value)
+        self._disk_set(key, scope, value)
+
+    def _remember(self, key, scope, value):
+        self._entries[key] = (scope, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_get(self, key, scope):
+        if self._pool is None:
+            return None
+        try:
+            with self._pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT value FROM response_cache WHERE key = ? AND scope = ?", (key, scope)
+                ).fetchone()
+            return pickle.loads(row[0]) if row else None
+        except (sqlite3.Error, pickle.UnpicklingError) as e:
+            logging.warning(f"Response cache read failed: {e}")
+            return None
+
+    def _disk_set(self, key, scope, value):
+        if self._pool is None:
+            return
+        try:
+            with self._pool.connection() as conn:
+                # Entries from earlier scopes can never be hit again
+                conn.execute("DELETE FROM response_cache WHERE scope != ?", (scope,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, scope, value) VALUES (?, ?, ?)",
+                    (key, scope, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Response cache write failed: {e}")
+
+    def invalidate(self, *args):
+        """Drop every cached response. Accepts and ignores callback arguments
+        so it can be registered directly as a reload hook."""
+        with self._lock:
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+        if self._pool is not None:
+            try:
+                with self._pool.connection() as conn:
+                    conn.execute("DELETE FROM response_cache")
+                    conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"Response cache invalidation failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        stats["shared"] = self._pool is not None
+        return stats
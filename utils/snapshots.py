@@ -0,0 +1,109 @@
+import os
+import json
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """SHA-256 of a source file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_info(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _atomic_save(path, array):
+    tmp = path + ".tmp.npy"
+    np.save(tmp, array, allow_pickle=False)
+    os.replace(tmp, path)
+
+
+def build_snapshot(df, source_path, snapshot_dir):
+    """Write ``df`` as one .npy file per column plus a manifest recording the
+    checksum of ``source_path``. Text columns are stored as integer codes with
+    their categories kept in the manifest."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    columns = []
+    for i, name in enumerate(df.columns):
+        column = df[name]
+        entry = {"name": name, "file": f"col{i}.npy"}
+        if isinstance(column.dtype, pd.CategoricalDtype) or column.dtype == object:
+            categorical = column.astype("category")
+            entry["kind"] = "category" if isinstance(column.dtype, pd.CategoricalDtype) else "object"
+            entry["categories"] = categorical.cat.categories.tolist()
+            values = categorical.cat.codes.to_numpy()
+        else:
+            entry["kind"] = "numeric"
+            values = column.to_numpy()
+        _atomic_save(os.path.join(snapshot_dir, entry["file"]), values)
+        columns.append(entry)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "rows": len(df),
+        "source": os.path.basename(source_path),
+        "source_sha256": file_checksum(source_path),
+        "source_info": _source_info(source_path),
+        "columns": columns,
+    }
+    # The manifest goes last so a half-written snapshot is never seen as fresh
+    tmp = os.path.join(snapshot_dir, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(snapshot_dir, MANIFEST))
+    logging.info(f"Wrote {len(df)}-row snapshot of {source_path} to {snapshot_dir}")
+    return manifest
+
+
+def _read_manifest(snapshot_dir):
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(source_path, snapshot_dir):
+    """True if the snapshot was built from the current contents of the source"""
+    manifest = _read_manifest(snapshot_dir)
+    if manifest is None or manifest.get("format_version") != FORMAT_VERSION:
+        return False
+    if not os.path.exists(source_path):
+        return False
+    # Unchanged size and mtime is taken as proof; otherwise fall back to hashing
+    if manifest.get("source_info") == _source_info(source_path):
+        return True
+    return manifest.get("source_sha256") == file_checksum(source_path)
+
+
+def load_snapshot(source_path, snapshot_dir):
+    """Memory-map a fresh snapshot as a read-only DataFrame, or return None"""
+    if not is_fresh(source_path, snapshot_dir):
+        return None
+    manifest = _read_manifest(snapshot_dir)
+    columns = {}
+    try:
+        for entry in manifest["columns"]:
+            values = np.load(os.path.join(snapshot_dir, entry["file"]), mmap_mode="r", allow_pickle=False)
+            if entry["kind"] == "numeric":
+                columns[entry["name"]] = values
+                continue
+            dtype = pd.CategoricalDtype(entry["categories"])
+            categorical = pd.Categorical.from_codes(values, dtype=dtype)
+            columns[entry["name"]] = categorical if entry["kind"] == "category" else np.asarray(categorical, dtype=object)
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Ignoring unreadable snapshot in {snapshot_dir}: {e}")
+        return None
+    return pd.DataFrame(columns, copy=False)
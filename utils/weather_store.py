@@ -0,0 +1,119 @@
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+
+# One record per station per day
+RECORD_DTYPE = np.dtype([
+    ("day", "datetime64[D]"),
+    ("temperature_C", "f8"),
+    ("rainfall_mm", "f8"),
+    ("humidity_pct", "f8"),
+])
+FIELDS = [name for name in RECORD_DTYPE.names if name != "day"]
+
+
+class WeatherStore:
+    """Append-only daily station records, one .npy partition per station and month.
+
+    Partitions live at ``<root>/<station>/<YYYY-MM>.npy`` as structured arrays
+    sorted by day. Reads memory-map only the partitions a date range touches
+    and slice them with a binary search, so years of history stay cheap.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _station_dir(self, station):
+        if not station or os.sep in station or station.startswith("."):
+            raise ValueError(f"Invalid station name: {station!r}")
+        return os.path.join(self.root, station)
+
+    def _partition(self, station, month):
+        return os.path.join(self._station_dir(station), f"{month}.npy")
+
+    def stations(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def has_station(self, station):
+        return bool(self.months(station))
+
+    def months(self, station):
+        """Sorted ``YYYY-MM`` labels of the partitions stored for a station"""
+        try:
+            names = os.listdir(self._station_dir(station))
+        except (OSError, ValueError):
+            return []
+        return sorted(name[:-4] for name in names if name.endswith(".npy"))
+
+    def version(self, station):
+        """Changes whenever records are appended for ``station``"""
+        months = self.months(station)
+        if not months:
+            return None
+        stat = os.stat(self._partition(station, months[-1]))
+        return (len(months), months[-1], stat.st_size, stat.st_mtime_ns)
+
+    def _load(self, station, month, mmap_mode=None):
+        return np.load(self._partition(station, month), mmap_mode=mmap_mode, allow_pickle=False)
+
+    def append(self, station, records):
+        """Append daily ``records`` (a DataFrame with ``date`` and the weather
+        columns) after the last stored day. Earlier or repeated days are
+        skipped, since partitions are never rewritten out of order. Returns
+        the number of rows stored."""
+        rows = np.empty(len(records), dtype=RECORD_DTYPE)
+        rows["day"] = pd.to_datetime(records["date"]).to_numpy().astype("datetime64[D]")
+        for field in FIELDS:
+            rows[field] = records[field].to_numpy(dtype=np.float64)
+        rows = rows[np.argsort(rows["day"], kind="stable")]
+
+        months = self.months(station)
+        if months:
+            last_day = self._load(station, months[-1], mmap_mode="r")["day"][-1]
+            stale = rows["day"] <= last_day
+            if stale.any():
+                logging.warning(f"Skipping {int(stale.sum())} weather records for {station} on or before {last_day}")
+            rows = rows[~stale]
+        if len(rows) == 0:
+            return 0
+        # Duplicate days within the batch keep the first record
+        rows = rows[np.concatenate(([True], np.diff(rows["day"]) > np.timedelta64(0, "D")))]
+
+        os.makedirs(self._station_dir(station), exist_ok=True)
+        labels = rows["day"].astype("datetime64[M]").astype(str)
+        for month in np.unique(labels):
+            batch = rows[labels == month]
+            path = self._partition(station, month)
+            if os.path.exists(path):
+                batch = np.concatenate([self._load(station, month), batch])
+            tmp = path + ".tmp.npy"
+            np.save(tmp, batch, allow_pickle=False)
+            os.replace(tmp, path)
+        logging.info(f"Appended {len(rows)} daily weather records for {station}")
+        return len(rows)
+
+    def read(self, station, start, end):
+        """Daily records for ``station`` with ``start <= day <= end`` as a DataFrame"""
+        start = np.datetime64(pd.Timestamp(start).date(), "D")
+        end = np.datetime64(pd.Timestamp(end).date(), "D")
+        first, last = str(start.astype("datetime64[M]")), str(end.astype("datetime64[M]"))
+
+        chunks = []
+        for month in self.months(station):
+            if month < first or month > last:
+                continue
+            days = self._load(station, month, mmap_mode="r")
+            lo = np.searchsorted(days["day"], start, side="left")
+            hi = np.searchsorted(days["day"], end, side="right")
+            chunks.append(days[lo:hi])
+
+        rows = np.concatenate(chunks) if chunks else np.empty(0, dtype=RECORD_DTYPE)
+        frame = pd.DataFrame({"date": rows["day"].astype("datetime64[ns]")})
+        frame["location"] = station
+        for field in FIELDS:
+            frame[field] = np.asarray(rows[field])
+        return frame